@@ -1,3 +1,11 @@
+import gc
+import logging
+
+# When run directly (or by gunicorn app:server), configure logging before
+# the layout import below loads the dataset and logs its memory report.
+# wsgi.py configures it first, which makes this call a no-op.
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
 import dash
 from dash import dcc, html
 import dash_bootstrap_components as dbc
@@ -10,5 +18,12 @@ app.layout = layout
 
 register_callbacks(app)
 
+server = app.server
+
+# The layout import above loads the shared dataset. Freezing it keeps the GC
+# from touching those objects, so workers forked by a pre-loading server
+# (e.g. gunicorn --preload app:server) share the pages copy-on-write.
+gc.freeze()
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8060, debug=True)
@@ -1,64 +1,272 @@
-from dash import Input, Output, callback, no_update, html, State, callback_context
+from dash import Input, Output, callback, no_update, State
 import httpx
+import orjson
+import os
+import time
 import logging
-from components.chatbot import create_message_bubble, create_typing_indicator
-from typing import List, Dict, Any
+import sqlite3
+import threading
+import uuid
+from components.chatbot import create_message_bubble, format_timestamp
+from typing import Dict, Any, Optional
 
-logging.basicConfig(level=logging.ERROR, filename="errors.log")
+
+CHAT_STREAM_URL = "http://127.0.0.1:8000/chat/stream"
+CHAT_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+CHAT_STREAM_DB = os.getenv("CHAT_STREAM_DB", "chat_streams.sqlite")
+# Streams nobody polls to the end (closed tab, superseded message) are
+# removed once they are this old.
+CHAT_STREAM_TTL = 3600
+# Answer tokens are written to the store at most this often; intent, SQL,
+# results and the end of the stream are written as soon as they arrive.
+FLUSH_INTERVAL = 0.1
+PREVIEW_ROWS = 10
+
+STATUS_MESSAGES = {
+    "start": "Thinking…",
+    "intent": "Understanding your question…",
+    "sql": "Running the query…",
+}
+
+
+class ChatStreamStore:
+    """
+    Progress of the chat streams in flight, keyed by stream id.
+
+    The state lives in a SQLite file rather than in process memory, so it
+    works with several server workers: the worker that starts a stream
+    writes to it from its reader thread, and whichever worker serves a poll
+    of the chat-stream-interval reads it back.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_streams ("
+                "id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def put(self, stream_id: str, state: Dict[str, Any]) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO chat_streams (id, state, updated_at) VALUES (?, ?, ?)",
+                    (stream_id, orjson.dumps(state), time.time())
+                )
+        finally:
+            conn.close()
+
+    def get(self, stream_id: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT state FROM chat_streams WHERE id = ?", (stream_id,)).fetchone()
+        finally:
+            conn.close()
+        return orjson.loads(row[0]) if row else None
+
+    def delete(self, stream_id: str) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM chat_streams WHERE id = ?", (stream_id,))
+        finally:
+            conn.close()
+
+    def purge_stale(self) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM chat_streams WHERE updated_at < ?", (time.time() - CHAT_STREAM_TTL,))
+        finally:
+            conn.close()
+
+
+chat_streams = ChatStreamStore(CHAT_STREAM_DB)
 
 def register_chat_callback(app):
     @app.callback(
         [Output("chat-display", "children"),
          Output("user-input", "value"),
-         Output("typing-indicator", "style")],
+         Output("typing-indicator", "style"),
+         Output("chat-stream", "data"),
+         Output("chat-stream-interval", "disabled")],
         [Input("send-button", "n_clicks"),
          Input("user-input", "n_submit")],
         [State("chat-display", "children"),
          State("user-input", "value")]
     )
     def update_chat(n_clicks, n_submit, current_messages, user_input):
-        ctx = callback_context
-        trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
-        
         if not user_input or user_input.strip() == "":
-            return no_update, no_update, {'display': 'none'}
-        
+            return no_update, no_update, {'display': 'none'}, no_update, no_update
+
         if current_messages is None:
             current_messages = []
-        
+
         user_message = create_message_bubble(user_input, is_bot=False)
-        
-        typing_style = {'display': 'block'}
-        current_messages_with_typing = current_messages + [user_message, create_typing_indicator()]
-        
-        try:
-            response = fetch_chat_response(user_input)
-            bot_response = response.get('response', "Sorry, I didn't get a valid response.")
-            
-            bot_message = create_message_bubble(bot_response, is_bot=True)
-            
-            updated_messages = current_messages + [user_message, bot_message]
-            return updated_messages, "", {'display': 'none'}
-        
-        except Exception as e:
-            logging.error(f"Error fetching chat response: {e}")
-            error_message = create_message_bubble("Sorry, there was an error processing your request.", is_bot=True)
-            
-            updated_messages = current_messages + [user_message, error_message]
-            return updated_messages, "", {'display': 'none'}
-
-def fetch_chat_response(user_query: str) -> Dict[str, Any]:
-    url = "http://127.0.0.1:8000/chat"
-    payload = {"query": user_query}
-    
+        stream_id = start_chat_stream(user_input)
+        pending_message = create_message_bubble(f"_{STATUS_MESSAGES['start']}_", is_bot=True)
+
+        updated_messages = current_messages + [user_message, pending_message]
+        stream = {"id": stream_id, "base": len(current_messages) + 1}
+        return updated_messages, "", {'display': 'none'}, stream, False
+
+    @app.callback(
+        [Output("chat-display", "children", allow_duplicate=True),
+         Output("chat-stream", "data", allow_duplicate=True),
+         Output("chat-stream-interval", "disabled", allow_duplicate=True)],
+        Input("chat-stream-interval", "n_intervals"),
+        [State("chat-stream", "data"),
+         State("chat-display", "children")],
+        prevent_initial_call=True
+    )
+    def render_chat_stream(n_intervals, stream, current_messages):
+        """
+        Re-renders the bot message of the active stream with whatever has
+        arrived so far, and stops polling once the stream is finished.
+        """
+        if not stream:
+            return no_update, no_update, True
+
+        state = chat_streams.get(stream["id"]) or {"done": True, "error": "The chat stream was lost."}
+        if state["done"]:
+            chat_streams.delete(stream["id"])
+
+        bot_message = create_message_bubble(render_chat_state(state), is_bot=True, timestamp=state.get("timestamp"))
+        updated_messages = (current_messages or [])[:stream["base"]] + [bot_message]
+
+        if state["done"]:
+            return updated_messages, None, True
+        return updated_messages, no_update, no_update
+
+def render_chat_state(state: Dict[str, Any]) -> str:
+    """
+    Builds the markdown of a bot message from the stream state: the intent,
+    the generated SQL and a preview of its rows as soon as each is known,
+    then the answer (or the current status while it is being written).
+    """
+    parts = []
+    if state.get("intent"):
+        parts.append(f"_Intent: {state['intent']}_")
+    if state.get("sql"):
+        parts.append(f"```sql\n{state['sql']}\n```")
+    if state.get("results"):
+        parts.append(results_table(state["results"]))
+
+    if state.get("error") and not state.get("text"):
+        parts.append("Sorry, there was an error processing your request.")
+    elif state.get("text"):
+        parts.append(state["text"])
+    elif not state.get("done"):
+        parts.append(f"_{state['status']}_")
+    return "\n\n".join(parts)
+
+def results_table(results: Dict[str, Any]) -> str:
+    """
+    Renders the previewed rows of a query result as a markdown table.
+    """
+    if results.get("error"):
+        return "_The query failed._"
+    columns = results.get("columns") or []
+    rows = results.get("rows") or []
+    row_count = results.get("row_count", len(rows))
+    if not columns or not rows:
+        return "_The query returned no rows._"
+
+    def cell(value: Any) -> str:
+        return "" if value is None else str(value).replace("|", "\\|").replace("\n", " ")
+
+    lines = [
+        "| " + " | ".join(cell(column) for column in columns) + " |",
+        "|" + "---|" * len(columns),
+    ]
+    lines += ["| " + " | ".join(cell(value) for value in row) + " |" for row in rows]
+    if row_count > len(rows):
+        lines.append(f"\n_Showing {len(rows)} of {row_count} rows._")
+    return "\n".join(lines)
+
+def start_chat_stream(user_query: str) -> str:
+    """
+    Starts reading /chat/stream for a query in a background thread and
+    returns the id under which its progress is kept in chat_streams.
+    """
+    stream_id = uuid.uuid4().hex
+    chat_streams.purge_stale()
+    state = {
+        "status": STATUS_MESSAGES["start"],
+        "intent": None,
+        "sql": None,
+        "results": None,
+        "text": "",
+        "done": False,
+        "error": None,
+        "timestamp": format_timestamp(),
+    }
+    chat_streams.put(stream_id, state)
+    threading.Thread(target=read_chat_stream, args=(stream_id, user_query, state), daemon=True).start()
+    return stream_id
+
+def read_chat_stream(stream_id: str, user_query: str, state: Dict[str, Any]) -> None:
+    """
+    Applies the events of /chat/stream to state and writes it to the store:
+    at once for everything but answer tokens, which are batched per FLUSH_INTERVAL.
+    """
+    flushed_at = time.monotonic()
     try:
-        with httpx.Client() as client:
-            response = client.post(url, json=payload, timeout=10)
-            response.raise_for_status()  
-            return response.json()
-    except httpx.RequestError as e:
-        logging.error(f"Network error: {e}")
-        raise
-    except httpx.HTTPStatusError as e:
-        logging.error(f"HTTP error: {e}")
-        raise
\ No newline at end of file
+        with httpx.Client(timeout=CHAT_TIMEOUT) as client:
+            with client.stream("POST", CHAT_STREAM_URL, json={"query": user_query}) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = orjson.loads(line)
+                    apply_chat_event(state, event)
+                    if event.get("event") != "token" or time.monotonic() - flushed_at >= FLUSH_INTERVAL:
+                        chat_streams.put(stream_id, state)
+                        flushed_at = time.monotonic()
+    except Exception as e:
+        logging.error(f"Error streaming chat response: {e}")
+        state["error"] = str(e)
+    finally:
+        state["done"] = True
+        try:
+            chat_streams.put(stream_id, state)
+        except sqlite3.Error as e:
+            logging.error(f"Could not store the end of chat stream {stream_id}: {e}")
+
+def apply_chat_event(state: Dict[str, Any], event: Dict[str, Any]) -> None:
+    kind = event.get("event")
+    if kind in STATUS_MESSAGES:
+        state["status"] = STATUS_MESSAGES[kind]
+    if kind == "intent":
+        state["intent"] = event.get("intent")
+    elif kind == "sql":
+        state["sql"] = event.get("sql")
+    elif kind == "results":
+        results = event.get("results") or {}
+        columns = results.get("columns") or []
+        data = results.get("data") or {}
+        row_count = results.get("row_count", 0)
+        values = [data.get(column) or [] for column in columns]
+        preview = min([PREVIEW_ROWS] + [len(column_values) for column_values in values])
+        state["results"] = {
+            "columns": columns,
+            "rows": [[column_values[i] for column_values in values] for i in range(preview)],
+            "row_count": row_count,
+            "error": results.get("error"),
+        }
+        state["status"] = f"Found {row_count} row{'s' if row_count != 1 else ''}, writing the answer…"
+    elif kind == "token":
+        state["text"] += event.get("text", "")
+    elif kind == "done":
+        state["text"] = event.get("response", state["text"])
+    elif kind == "error":
+        logging.error(f"Chat stream error: {event.get('detail')}")
+        state["error"] = event.get("detail")
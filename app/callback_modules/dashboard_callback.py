@@ -1,39 +1,24 @@
 import requests
 from dash import Input, Output, callback, dcc, html
 import plotly.graph_objects as go
-import pandas as pd
 
-API_URL = "http://0.0.0.0:8000/get_filtered_data"  
+SUMMARY_API_URL = "http://0.0.0.0:8000/dashboard_summary"
 
-def fetch_filtered_data(start_date, end_date, order_status):
-    """Fetch filtered data from the API."""
+def fetch_dashboard_summary(start_date, end_date, order_status):
+    """Fetch the pre-aggregated dashboard KPIs and chart series from the API."""
     if not start_date or not end_date or not order_status:
-        return pd.DataFrame()  
+        return {}
 
-    order_status_str = ",".join(order_status)  
-    params = {"start_date": start_date, "end_date": end_date, "order_status": order_status_str}
+    params = {"start_date": start_date, "end_date": end_date, "order_status": ",".join(order_status)}
 
     try:
-        response = requests.get(API_URL, params=params)
+        response = requests.get(SUMMARY_API_URL, params=params)
         response.raise_for_status()
-        data = response.json()
-
-        if "data" in data:
-            df = pd.DataFrame(data["data"])
-        else:
-            return pd.DataFrame()
-
-        if "created_at" in df:
-            df["created_at"] = pd.to_datetime(df["created_at"], errors="coerce")
-
-        if "grand_total" in df:
-            df["grand_total"] = pd.to_numeric(df["grand_total"], errors="coerce").fillna(0)
-
-        return df
+        return response.json()
 
     except requests.exceptions.RequestException as e:
-        print(f"Error fetching data: {e}")
-        return pd.DataFrame()
+        print(f"Error fetching dashboard summary: {e}")
+        return {}
 
 def generate_sales_trend_chart(trend_data):
     """Create the sales trend figure."""
@@ -74,32 +59,18 @@ def register_dashboard_callback(app):
     )
     def update_dashboard(start_date, end_date, order_status):
         print(f"Fetching data for {start_date} to {end_date} | Statuses: {order_status}")
-        filtered_df = fetch_filtered_data(start_date, end_date, order_status)
+        summary = fetch_dashboard_summary(start_date, end_date, order_status)
 
-        if filtered_df.empty:
+        if not summary.get("trend", {}).get("created_at"):
             return go.Figure(), go.Figure(), "$0.00", "0", "$0.00"
 
-        required_cols = ["created_at", "grand_total", "product_category", "item_id"]
-        missing_cols = [col for col in required_cols if col not in filtered_df.columns]
-        if missing_cols:
-            print(f"Missing columns: {missing_cols}")
-            return go.Figure(), go.Figure(), "$0.00", "0", "$0.00"
-
-        trend_data = (
-            filtered_df.groupby(pd.Grouper(key="created_at", freq="D"))["grand_total"]
-            .sum()
-            .reset_index()
-        )
-        category_data = (
-            filtered_df.groupby("product_category")["grand_total"]
-            .sum()
-            .reset_index()
-            .sort_values(by="grand_total", ascending=False)
-        )
+        trend_data = summary["trend"]
+        category_data = summary["categories"]
 
-        total_sales = f"${filtered_df['grand_total'].sum():,.2f}"
-        total_orders = f"{filtered_df['item_id'].nunique():,}"
-        avg_order_value = f"${filtered_df['grand_total'].mean():,.2f}" if not filtered_df.empty else "$0.00"
+        total_sales = f"${summary['total_sales']:,.2f}"
+        approximate = "~" if summary.get("total_orders_error") else ""
+        total_orders = f"{approximate}{summary['total_orders']:,}"
+        avg_order_value = f"${summary['avg_order_value']:,.2f}"
 
         sales_trend_fig = generate_sales_trend_chart(trend_data)
 
@@ -4,11 +4,6 @@ import plotly.graph_objects as go
 from constants.generic_constants import CHART_TYPES, AGGREGATIONS, LIGHT_THEME, DARK_THEME, load_data
 from components.create_graph_with_controls import create_graph_with_controls
 
-df = load_data()
-
-NUMERIC_COLUMNS = df.select_dtypes(include=['number']).columns.tolist()
-CATEGORICAL_COLUMNS = df.select_dtypes(include=['object', 'category']).columns.tolist()
-
 def register_graph_update_callback(app):
     @app.callback(
         Output({'type': 'custom-graph', 'index': MATCH}, 'figure'),
@@ -28,9 +23,10 @@ def register_graph_update_callback(app):
             )
 
         try:
+            df = load_data()
             if aggregation and aggregation in AGGREGATIONS:
                 agg_func = AGGREGATIONS[aggregation]
-                aggregated_df = df.groupby(x_axis).agg(
+                aggregated_df = df.groupby(x_axis, observed=True).agg(
                     {y_axis: agg_func}).reset_index()
                 x = aggregated_df[x_axis]
                 y = aggregated_df[y_axis]
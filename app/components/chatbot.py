@@ -132,6 +132,10 @@ def create_chatbot():
                         }
                     ),
                     
+                    # Streaming state: the active /chat/stream id and the poll that renders it
+                    dcc.Store(id="chat-stream"),
+                    dcc.Interval(id="chat-stream-interval", interval=250, disabled=True),
+
                     # Input Area
                     html.Div(
                         [
@@ -1,14 +1,12 @@
 from dash import dcc, html
 import dash_bootstrap_components as dbc
-from constants.generic_constants import load_data
-
-df = load_data()
-
-NUMERIC_COLUMNS = df.select_dtypes(include=['number']).columns.tolist()
-CATEGORICAL_COLUMNS = df.select_dtypes(include=['object', 'category']).columns.tolist()
+from constants.generic_constants import load_data, get_numeric_columns, get_categorical_columns
 
 def create_custom_chart_controls(id_suffix=""):
     """Create the custom chart controls section with enhanced UI/UX."""
+    df = load_data()
+    numeric_columns = get_numeric_columns()
+    categorical_columns = get_categorical_columns()
     return dbc.Card(
         [
             dbc.CardHeader(
@@ -54,9 +52,9 @@ def create_custom_chart_controls(id_suffix=""):
                                             {'label': col, 'value': col}
                                             for col in df.columns
                                         ],
-                                        value=NUMERIC_COLUMNS[0]
-                                        if NUMERIC_COLUMNS
-                                        else CATEGORICAL_COLUMNS[0],
+                                        value=numeric_columns[0]
+                                        if numeric_columns
+                                        else categorical_columns[0],
                                         placeholder="Select a column for X-Axis",
                                         className="chart-dropdown",
                                     ),
@@ -73,10 +71,10 @@ def create_custom_chart_controls(id_suffix=""):
                                         id={'type': 'y-axis-dropdown', 'index': id_suffix},
                                         options=[
                                             {'label': col, 'value': col}
-                                            for col in NUMERIC_COLUMNS
+                                            for col in numeric_columns
                                         ],
-                                        value=NUMERIC_COLUMNS[1]
-                                        if len(NUMERIC_COLUMNS) > 1
+                                        value=numeric_columns[1]
+                                        if len(numeric_columns) > 1
                                         else None,
                                         placeholder="Select a column for Y-Axis",
                                         className="chart-dropdown",
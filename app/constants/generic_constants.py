@@ -3,19 +3,33 @@ import pandas as pd
 
 import os
 import pandas as pd
+from functools import lru_cache
+from services.dataset_cache import load_dataset
 
+@lru_cache(maxsize=None)
 def load_data():
+    """
+    Returns the process-wide dataset, loading it on first use.
+    The frame is shared by every module and must be treated as read-only.
+    """
     base_path = os.path.dirname(os.path.abspath(__file__))
     file_path = os.path.join(base_path, "sample_data.csv")
-    df = pd.read_csv(file_path, low_memory=False)
-    if 'created_at' in df.columns:
-        df["created_at"] = pd.to_datetime(df["created_at"])
-    else:
+    df = load_dataset(file_path, parse_dates=["created_at"], date_format="ISO8601")
+    if 'created_at' not in df.columns:
         raise ValueError("'created_at' column not found in the data.")
     
     return df
 
 
+@lru_cache(maxsize=None)
+def get_numeric_columns():
+    return tuple(load_data().select_dtypes(include=['number']).columns)
+
+
+@lru_cache(maxsize=None)
+def get_categorical_columns():
+    return tuple(load_data().select_dtypes(include=['object', 'category']).columns)
+
 
 COLORS = {
     'primary': '#2C3E50',
@@ -2,7 +2,7 @@ from dash.dependencies import Input, Output, State
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 from datetime import datetime
-from constants.generic_constants import COLORS, load_data
+from constants.generic_constants import COLORS
 from components.header import create_header
 from components.action_bar import create_action_bar
 from components.filter import create_filters
@@ -11,11 +11,6 @@ from components.chatbot import create_chatbot
 from components.chart import create_charts
 from components.create_graph_with_controls import create_graph_with_controls
 from components.footer import create_footer
-df = load_data()
-
-NUMERIC_COLUMNS = df.select_dtypes(include=['number']).columns.tolist()
-CATEGORICAL_COLUMNS = df.select_dtypes(
-    include=['object', 'category']).columns.tolist()
 
 FIRST_GRAPH_ID = 1
 
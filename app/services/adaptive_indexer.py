@@ -0,0 +1,249 @@
+import re
+import queue
+import sqlite3
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+
+from sqlite_loader import configure_connection, quote_identifier
+from sqlite_indexer import index_name
+
+AUTO_INDEX_PREFIX = "auto_idx"
+QUEUE_SIZE = 1024
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+WHERE_CLAUSE = re.compile(r"\bWHERE\b(.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bHAVING\b|\bLIMIT\b|$)", re.I | re.S)
+GROUP_BY_CLAUSE = re.compile(r"\bGROUP\s+BY\b(.*?)(?=\bHAVING\b|\bORDER\s+BY\b|\bLIMIT\b|\)|;|$)", re.I | re.S)
+PREDICATE_COLUMN = re.compile(
+    r'(?:"([^"]+)"|`([^`]+)`|\b([A-Za-z_]\w*))\s*(?:=|<=|>=|<|>|\bIN\b|\bBETWEEN\b|\bLIKE\b|\bIS\b)', re.I
+)
+
+
+class AdaptiveIndexer:
+    """
+    Watches the SQL generated for a table and adds the indexes it keeps missing.
+
+    Each observed statement is checked in a background thread with
+    EXPLAIN QUERY PLAN. When the plan scans the whole table (or sorts into
+    a temporary B-tree for GROUP BY), the plain columns it filters or
+    groups on are counted; once a column reaches `threshold` such
+    statements it gets a single-column index, followed by ANALYZE.
+
+    Indexes created here are named with AUTO_INDEX_PREFIX so the budget
+    (index count and total bytes) also covers the ones built before a restart.
+    stats() lists them with the remaining budget, so they can be reviewed
+    and dropped by name.
+    """
+
+    def __init__(self, db_path: str, table_name: str, threshold: int = 3, max_indexes: int = 8, max_bytes: int = 64 * 1024 * 1024):
+        self.db_path = db_path
+        self.table_name = table_name
+        self.threshold = threshold
+        self.max_indexes = max_indexes
+        self.max_bytes = max_bytes
+
+        self.candidates: Counter = Counter()
+        self.rejected: Set[str] = set()
+        self.created: List[str] = []
+        self.sizes: Dict[str, int] = {}
+        self.auto_indexes: List[str] = []
+        self.used_bytes = 0
+        self.observed = 0
+        self.full_scans = 0
+        self.dropped = 0
+
+        self.statements: "queue.Queue[str]" = queue.Queue(maxsize=QUEUE_SIZE)
+        self.lock = threading.Lock()
+        self.worker = threading.Thread(target=self._run, name="adaptive-indexer", daemon=True)
+        self.worker.start()
+
+    def observe(self, sql: str) -> None:
+        """
+        Queues a statement for plan inspection without blocking the caller.
+        """
+        try:
+            self.statements.put_nowait(sql)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        conn = configure_connection(sqlite3.connect(self.db_path))
+        try:
+            self._record_budget(conn)
+        except sqlite3.Error as e:
+            logging.warning(f"Could not measure existing adaptive indexes: {e}")
+        while True:
+            sql = self.statements.get()
+            try:
+                self._inspect(conn, sql)
+            except Exception as e:
+                logging.warning(f"Adaptive indexing skipped a statement: {e}")
+            finally:
+                self.statements.task_done()
+
+    def _table_columns(self, conn: sqlite3.Connection) -> Dict[str, str]:
+        return {
+            row[1].lower(): row[1]
+            for row in conn.execute(f"PRAGMA table_info({quote_identifier(self.table_name)})")
+        }
+
+    def _indexed_columns(self, conn: sqlite3.Connection) -> Set[str]:
+        """
+        Columns that already lead an index on the table.
+        """
+        leading = set()
+        for index in conn.execute(f"PRAGMA index_list({quote_identifier(self.table_name)})").fetchall():
+            columns = conn.execute(f"PRAGMA index_info({quote_identifier(index[1])})").fetchall()
+            if columns and columns[0][2] is not None:
+                leading.add(columns[0][2])
+        return leading
+
+    def _auto_indexes(self, conn: sqlite3.Connection) -> List[str]:
+        return [
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND substr(name, 1, ?) = ?",
+                (self.table_name, len(AUTO_INDEX_PREFIX) + 1, f"{AUTO_INDEX_PREFIX}_")
+            )
+        ]
+
+    def _record_budget(self, conn: sqlite3.Connection) -> None:
+        """
+        Remembers the adaptive indexes on the table (including ones built
+        before a restart) and their total size, for stats().
+        """
+        auto_indexes = self._auto_indexes(conn)
+        used_bytes = sum(self._index_bytes(conn, index) for index in auto_indexes)
+        with self.lock:
+            self.auto_indexes = auto_indexes
+            self.used_bytes = used_bytes
+
+    def _index_bytes(self, conn: sqlite3.Connection, name: str) -> int:
+        try:
+            return int(conn.execute("SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name = ?", (name,)).fetchone()[0])
+        except sqlite3.Error:
+            # dbstat is not compiled in; fall back to the sizes measured at creation.
+            return self.sizes.get(name, 0)
+
+    @staticmethod
+    def _database_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+    def _scan_kinds(self, conn: sqlite3.Connection, sql: str) -> Set[str]:
+        """
+        Returns which missing-index symptoms the plan shows: 'scan' for a
+        full scan of the table, 'group' for a temporary B-tree for GROUP BY.
+        """
+        table = self.table_name.upper()
+        kinds = set()
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall():
+            detail = row[-1].upper()
+            if detail.startswith("SCAN") and table in detail and "USING" not in detail:
+                kinds.add("scan")
+            if "TEMP B-TREE FOR GROUP BY" in detail:
+                kinds.add("group")
+        return kinds
+
+    @staticmethod
+    def candidate_columns(sql: str, columns: Dict[str, str], kinds: Set[str]) -> Set[str]:
+        """
+        Extracts the plain columns a statement filters on (when the table is
+        scanned) and groups on (when grouping sorts or the table is scanned).
+        Columns wrapped in functions are left out since an index cannot serve them.
+        """
+        sql = STRING_LITERAL.sub("''", sql)
+        found = set()
+
+        if "scan" in kinds:
+            for clause in WHERE_CLAUSE.findall(sql):
+                for match in PREDICATE_COLUMN.finditer(clause):
+                    name = next(group for group in match.groups() if group)
+                    if name.lower() in columns:
+                        found.add(columns[name.lower()])
+
+        if kinds:
+            for clause in GROUP_BY_CLAUSE.findall(sql):
+                for item in clause.split(","):
+                    name = item.strip().strip('"`')
+                    if name.lower() in columns:
+                        found.add(columns[name.lower()])
+
+        return found
+
+    def _inspect(self, conn: sqlite3.Connection, sql: str) -> None:
+        kinds = self._scan_kinds(conn, sql)
+        with self.lock:
+            self.observed += 1
+            if "scan" in kinds:
+                self.full_scans += 1
+        if not kinds:
+            return
+
+        indexed = self._indexed_columns(conn)
+        for column in self.candidate_columns(sql, self._table_columns(conn), kinds):
+            if column in indexed or column in self.rejected:
+                continue
+            with self.lock:
+                self.candidates[column] += 1
+                ready = self.candidates[column] >= self.threshold
+            if ready:
+                self._create(conn, column)
+
+    def _create(self, conn: sqlite3.Connection, column: str) -> Optional[str]:
+        """
+        Builds the index if the count and size budgets allow it. The size of
+        an index is only known once built, so one that pushes the total over
+        max_bytes is dropped again and the column is not retried.
+        """
+        existing = self._auto_indexes(conn)
+        if len(existing) >= self.max_indexes:
+            self.rejected.add(column)
+            logging.info(f"Adaptive index budget reached ({self.max_indexes} indexes); not indexing {column}")
+            return None
+
+        name = index_name(self.table_name, (column,), prefix=AUTO_INDEX_PREFIX)
+        used_bytes = sum(self._index_bytes(conn, index) for index in existing)
+        bytes_before = self._database_bytes(conn)
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {quote_identifier(name)} "
+            f"ON {quote_identifier(self.table_name)} ({quote_identifier(column)})"
+        )
+        self.sizes[name] = max(self._database_bytes(conn) - bytes_before, 0)
+        size = self._index_bytes(conn, name)
+        if used_bytes + size > self.max_bytes:
+            conn.execute(f"DROP INDEX IF EXISTS {quote_identifier(name)}")
+            conn.commit()
+            self.rejected.add(column)
+            logging.info(f"Adaptive index on {column} ({size} bytes) exceeds the {self.max_bytes} byte budget; dropped")
+            return None
+
+        conn.execute(f"ANALYZE {quote_identifier(name)}")
+        conn.commit()
+        with self.lock:
+            self.created.append(name)
+            self.candidates.pop(column, None)
+        self._record_budget(conn)
+        logging.info(f"Created adaptive index {name} ({size} bytes)")
+        return name
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "observed": self.observed,
+                "full_scans": self.full_scans,
+                "dropped": self.dropped,
+                "pending": self.statements.qsize(),
+                "candidates": dict(self.candidates.most_common(10)),
+                "created": list(self.created),
+                "rejected": sorted(self.rejected),
+                "auto_indexes": list(self.auto_indexes),
+                "budget": {
+                    "indexes": len(self.auto_indexes),
+                    "max_indexes": self.max_indexes,
+                    "remaining_indexes": max(self.max_indexes - len(self.auto_indexes), 0),
+                    "bytes": self.used_bytes,
+                    "max_bytes": self.max_bytes,
+                    "remaining_bytes": max(self.max_bytes - self.used_bytes, 0),
+                },
+            }
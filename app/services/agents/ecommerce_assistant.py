@@ -1,22 +1,40 @@
-import os
-from langchain_groq import ChatGroq
+from typing import AsyncIterator
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from llm_registry import get_llm
+
+ECOMMERCE_PROMPT = PromptTemplate.from_template("""
+    You are an AI assistant specialized in **e-commerce business intelligence**. 
+    Your role is to assist **business stakeholders, analysts, and decision-makers** 
+    by providing **data-driven insights, analytics, and strategic advice.** 
+
+    Focus areas include:
+    - **Sales performance** (revenue trends, top-selling products, seasonal insights)
+    - **Customer behavior** (purchase trends, churn risks, demographics)
+    - **Inventory management** (stock levels, forecasting demand, supply chain insights)
+    - **Marketing effectiveness** (ad performance, conversion rates, ROI)
+    - **Competitive analysis** (market trends, pricing strategies, competitor benchmarking)
+    - **Operational efficiency** (order fulfillment times, logistics bottlenecks)
+
+    Your responses must be **precise, actionable, and insightful**, avoiding generic replies. 
+
+    User Query: {prompt}
+    Previous Conversation Context: {context}
+    Provide a structured, analytical, and data-backed response.
+""")
 
 class NormalEcommerceAssistantAgent:
     def __init__(self):
         """
         Initializes the e-commerce assistant agent, tailored for business stakeholders.
         """
-        self.llm = ChatGroq(
-            temperature=0.2,
-            model_name="llama3-70b-8192",
-            groq_api_key=os.getenv("GROQ_KEY")
-        )
+        self.llm = get_llm(temperature=0.2)
+        self.chain = ECOMMERCE_PROMPT | self.llm | StrOutputParser()
 
-    def generate_response(self, user_prompt: str, context: str) -> str:
+    async def stream_response(self, user_prompt: str, context: str) -> AsyncIterator[str]:
         """
-        Generates an insightful response tailored for e-commerce stakeholders.
+        Generates an insightful response tailored for e-commerce stakeholders,
+        streamed chunk by chunk as the model produces it.
         
         This chatbot is designed to provide:
         - Business analytics insights
@@ -28,32 +46,10 @@ class NormalEcommerceAssistantAgent:
         
         Args:
             user_prompt (str): The stakeholder's query.
+            context (str): Previous conversation context.
         
-        Returns:
-            str: The generated response.
+        Yields:
+            str: Chunks of the generated response.
         """
-
-        ecommerce_prompt = PromptTemplate.from_template("""
-            You are an AI assistant specialized in **e-commerce business intelligence**. 
-            Your role is to assist **business stakeholders, analysts, and decision-makers** 
-            by providing **data-driven insights, analytics, and strategic advice.** 
-            
-            Focus areas include:
-            - **Sales performance** (revenue trends, top-selling products, seasonal insights)
-            - **Customer behavior** (purchase trends, churn risks, demographics)
-            - **Inventory management** (stock levels, forecasting demand, supply chain insights)
-            - **Marketing effectiveness** (ad performance, conversion rates, ROI)
-            - **Competitive analysis** (market trends, pricing strategies, competitor benchmarking)
-            - **Operational efficiency** (order fulfillment times, logistics bottlenecks)
-
-            Your responses must be **precise, actionable, and insightful**, avoiding generic replies. 
-            
-            User Query: {prompt}
-            Previous Conversation Context: {context}
-            Provide a structured, analytical, and data-backed response.
-        """)
-
-        chain = ecommerce_prompt | self.llm | StrOutputParser()
-
-        response = chain.invoke({"prompt": user_prompt, "context": context})
-        return response
+        async for chunk in self.chain.astream({"prompt": user_prompt, "context": context}):
+            yield chunk
@@ -1,53 +1,101 @@
+import os
+import json
 import pandas as pd
 import logging
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Optional, Union
 # from utils.helpers import convert_to_snake_case
 from utils import convert_to_snake_case
+from column_profile import ColumnProfile
+from dataset_cache import cache_dir_for, file_fingerprint
+
+SCHEMA_FILE_SUFFIX = ".schema.json"
+SCHEMA_FORMAT_VERSION = 1
+CHUNK_ROWS = 100_000
+CATEGORICAL_MAX_DISTINCT = 20
+EXAMPLE_VALUES = 10
 
 class SchemaInferenceAgent:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, chunk_rows: int = CHUNK_ROWS):
         self.file_path = file_path
+        self.chunk_rows = chunk_rows
         self.schema: Dict[str, Dict[str, Union[List[Any], Dict[str, Any]]]] = {}
 
+    def schema_cache_path(self) -> str:
+        """
+        The persisted schema sits beside the columnar cache directory
+        (e.g. data/raw/.cache/data.csv.schema.json), not inside it, so
+        rebuilding the columnar cache does not delete it.
+        """
+        return cache_dir_for(self.file_path) + SCHEMA_FILE_SUFFIX
+
+    def _load_cached(self, fingerprint: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.schema_cache_path()) as fh:
+                cached = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if cached.get("format_version") != SCHEMA_FORMAT_VERSION or cached.get("source") != fingerprint:
+            return None
+        return cached["schema"]
+
+    def _save(self, fingerprint: Dict[str, Any], schema: Dict[str, Any]) -> None:
+        path = self.schema_cache_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staging_path = f"{path}.{os.getpid()}.tmp"
+        with open(staging_path, "w") as fh:
+            json.dump({"format_version": SCHEMA_FORMAT_VERSION, "source": fingerprint, "schema": schema}, fh)
+        os.replace(staging_path, path)
+
+    def _profile(self) -> Dict[str, ColumnProfile]:
+        profiles: Dict[str, ColumnProfile] = {}
+        for chunk in pd.read_csv(self.file_path, dtype=str, chunksize=self.chunk_rows):
+            chunk.columns = [convert_to_snake_case(col) for col in chunk.columns]
+            for column in chunk.columns:
+                profiles.setdefault(column, ColumnProfile()).update(chunk[column])
+        return profiles
+
     def infer_schema(self) -> Dict[str, Dict[str, Union[List[Any], Dict[str, Any]]]]:
         """
         Infers the schema by extracting:
         - Column names (converted to snake_case)
-        - Unique values for categorical columns (limited to 10 examples)
+        - Example values for categorical columns (limited to 10, drawn from a reservoir sample)
         - Summary statistics for numerical columns (min, max, mean, std, unique count)
-        
+
+        The file is read once in chunks of chunk_rows; distinct counts are
+        exact for small columns and HyperLogLog estimates for large ones.
+        The result is saved under the dataset cache and reused while the
+        file fingerprint is unchanged.
+
         Returns:
             dict: {column_name: {'type': 'categorical' or 'numerical', 'values' (for categorical) or 'stats' (for numerical)}}
         """
         try:
-            df = pd.read_csv(self.file_path, dtype=str, low_memory=False)
-
-            # Convert column names to snake_case
-            df.columns = [convert_to_snake_case(col) for col in df.columns]
+            fingerprint = file_fingerprint(self.file_path)
+            cached = self._load_cached(fingerprint)
+            if cached is not None:
+                self.schema = cached
+                return self.schema
 
             schema_info = {}
 
-            for column in df.columns:
-                if df[column].dtype == 'object' or df[column].nunique() < 20:
+            for column, profile in self._profile().items():
+                distinct_count = profile.distinct_count()
+                if not profile.numeric or distinct_count < CATEGORICAL_MAX_DISTINCT:
                     schema_info[column] = {
                         "type": "categorical",
-                        "values": df[column].dropna().unique()[:10].tolist() 
+                        "values": profile.examples(EXAMPLE_VALUES),
+                        "distinct_count": distinct_count
                     }
-                else:  
+                else:
                     schema_info[column] = {
                         "type": "numerical",
-                        "stats": {
-                            "min": float(df[column].min()) if pd.notna(df[column].min()) else None,
-                            "max": float(df[column].max()) if pd.notna(df[column].max()) else None,
-                            "mean": float(df[column].mean()) if pd.notna(df[column].mean()) else None,
-                            "std": float(df[column].std()) if pd.notna(df[column].std()) else None,
-                            "unique_count": int(df[column].nunique())
-                        }
+                        "stats": {**profile.numeric_stats(), "unique_count": distinct_count}
                     }
 
+            self._save(fingerprint, schema_info)
             self.schema = schema_info
             return self.schema
 
         except Exception as e:
             logging.error(f"Error inferring schema: {e}")
-            return {}
\ No newline at end of file
+            return {}
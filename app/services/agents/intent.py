@@ -1,19 +1,12 @@
-import os
-from typing import Any
-from langchain_groq import ChatGroq
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from models.intent_classification import IntentClassification
+from llm_registry import get_llm
 
 class IntentAgent:
     def __init__(self):
-        self.llm = ChatGroq(
-            temperature=0,
-            model_name="llama3-70b-8192",
-            groq_api_key=os.getenv("GROQ_KEY")
-        )
+        self.llm = get_llm(temperature=0)
 
-    def classify_intent(self, user_prompt: str) -> IntentClassification:
         output_parser = PydanticOutputParser(
             pydantic_object=IntentClassification)
 
@@ -35,10 +28,11 @@ class IntentAgent:
             }
         )
 
-        chain = intent_prompt | self.llm | output_parser
+        self.chain = intent_prompt | self.llm | output_parser
 
+    async def classify_intent(self, user_prompt: str) -> IntentClassification:
         try:
-            result = chain.invoke({"prompt": user_prompt})
+            result = await self.chain.ainvoke({"prompt": user_prompt})
             return result
         except Exception as e:
             print(f"Intent classification error: {e}")
@@ -1,43 +1,87 @@
-import os
-import sqlite3
-from typing import List, Dict, Any
-from langchain_groq import ChatGroq
+import asyncio
+from typing import Awaitable, Dict, Any, List, Optional
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from sqlite_pool import ReadOnlyPool, run_query, QUERY_TIMEOUT_SECONDS, MAX_RESULT_ROWS
+from llm_registry import get_llm
+from translation_cache import TranslationCache
+from sql_result_cache import SQLResultCache
+from sqlite_loader import table_version
+from schema_prompt import SchemaPrompt, TOKEN_BUDGET
+from value_index import ValueIndex
+
+QUERY_PROMPT = PromptTemplate.from_template("""
+    Schema: {schema}
+
+    User Query: {user_query}
+
+    Stored column values that may match words in the query (use them only if the query really filters on them): {literals}
+
+    Generate a valid SQLite query to answer the user's query.
+    - Make sure to use the correct spellings according to English Language even if the query has some spelling mistakes.
+    - Use '{table_name}' as the table name.
+    - When filtering on one of those stored values, spell it exactly as listed.
+    - Do not add any extra formatting or characters (like backticks, comments, or explanations).
+    - Only output the SQLite query as plain text.
+""")
+
+def format_literals(literals: List[Dict[str, Any]]) -> str:
+    """
+    Renders resolved values as SQL comparisons, e.g. "payment_method = 'cod'; order_status = 'canceled'".
+    """
+    if not literals:
+        return "none"
+    return "; ".join("{} = '{}'".format(literal["column"], str(literal["value"]).replace("'", "''")) for literal in literals)
 
 class SQLQueryAgent:
-    def __init__(self, schema: Dict[str, str], database_path: str):
+    def __init__(
+        self,
+        schema: Dict[str, str],
+        database_path: str,
+        pool: Optional[ReadOnlyPool] = None,
+        timeout_seconds: float = QUERY_TIMEOUT_SECONDS,
+        max_rows: int = MAX_RESULT_ROWS,
+        translation_cache: Optional[TranslationCache] = None,
+        result_cache: Optional[SQLResultCache] = None,
+        table_name: str = "sales_table",
+        schema_token_budget: int = TOKEN_BUDGET,
+        value_index: Optional[ValueIndex] = None
+    ):
         self.schema = schema
+        self.schema_prompt = SchemaPrompt(schema, token_budget=schema_token_budget)
         self.database_path = database_path
+        self.pool = pool or ReadOnlyPool(database_path, size=1)
+        self.timeout_seconds = timeout_seconds
+        self.max_rows = max_rows
+        self.translation_cache = translation_cache
+        self.result_cache = result_cache
+        self.table_name = table_name
+        self.value_index = value_index
+        self.chain = QUERY_PROMPT | get_llm(temperature=0) | StrOutputParser()
 
-    def generate_sql_query(self, user_query: str, table_name: str) -> str:
+    async def generate_sql_query(self, user_query: str, table_name: str, store_when: Optional[Awaitable[bool]] = None) -> str:
         """
         Generate SQL query using Groq API with error handling.
+        Questions already in the translation cache are answered without calling the LLM.
+        New translations are cached once store_when, if given, resolves to True;
+        speculative calls use it to cache only SQL for confirmed data questions.
+        Column values the question refers to are resolved through the value
+        index and given to the model verbatim; that lookup and the schema
+        rendering run in a worker thread.
         """
-        try:
-            llm = ChatGroq(
-                temperature=0,
-                model_name="llama3-70b-8192",
-                groq_api_key=os.getenv("GROQ_KEY")
-            )
-
-            query_prompt = PromptTemplate.from_template("""
-                Schema: {schema}
-
-                User Query: {user_query}
-
-                Generate a valid SQLite query to answer the user's query.
-                - Make sure to use the correct spellings according to English Language even if the query has some spelling mistakes.
-                - Use '{table_name}' as the table name.
-                - Do not add any extra formatting or characters (like backticks, comments, or explanations).
-                - Only output the SQLite query as plain text.
-            """)
+        if self.translation_cache is not None:
+            cached_query = await asyncio.to_thread(self.translation_cache.get, user_query)
+            if cached_query is not None:
+                return cached_query
 
-            chain = query_prompt | llm | StrOutputParser()
-
-            raw_response = chain.invoke({
-                "schema": str(self.schema),
+        try:
+            # Value resolution and schema rendering are CPU work; keep them off the event loop.
+            literals = await asyncio.to_thread(self.value_index.resolve, user_query) if self.value_index is not None else []
+            schema_text = await asyncio.to_thread(self.schema_prompt.render, user_query, literals)
+            raw_response = await self.chain.ainvoke({
+                "schema": schema_text,
                 "user_query": user_query,
+                "literals": format_literals(literals),
                 "table_name": table_name,
             })
 
@@ -46,6 +90,8 @@ class SQLQueryAgent:
             if not sql_query:
                 raise ValueError("Generated query is empty or invalid.")
 
+            if self.translation_cache is not None and (store_when is None or await store_when):
+                await asyncio.to_thread(self.translation_cache.put, user_query, sql_query)
             return sql_query
 
         except ValueError as ve:
@@ -56,15 +102,34 @@ class SQLQueryAgent:
             print(f"Error generating SQL query: {e}")
             return "SELECT * FROM sales_table LIMIT 10;"
 
-    def execute_query(self, query: str) -> List[Dict[str, Any]]:
+    def execute_query(self, query: str) -> Dict[str, Any]:
+        """
+        Runs the query on a pooled read-only connection, within the time
+        budget and row cap. This blocks; async callers use aexecute_query.
+        Results are served from the result cache while the table has not
+        been reloaded since the same statement last ran.
+
+        Returns:
+            dict: {'columns': [...], 'data': {column: [values]}, 'row_count': int, 'truncated': bool},
+            plus 'error' when the query failed or ran out of time.
+        """
         try:
-            with sqlite3.connect(self.database_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(query)
-                columns = [column[0] for column in cursor.description]
-                results = [dict(zip(columns, row))
-                           for row in cursor.fetchall()]
-            return results
+            with self.pool.connection() as conn:
+                if self.result_cache is None:
+                    return run_query(conn, query, self.timeout_seconds, self.max_rows)
+
+                version = table_version(conn, self.table_name)
+                results = self.result_cache.get(query, version)
+                if results is None:
+                    results = run_query(conn, query, self.timeout_seconds, self.max_rows)
+                    self.result_cache.put(query, version, results)
+                return results
         except Exception as e:
             print(f"Query execution error: {e}")
-            return []
\ No newline at end of file
+            return {"columns": [], "data": {}, "row_count": 0, "truncated": False, "error": str(e)}
+
+    async def aexecute_query(self, query: str) -> Dict[str, Any]:
+        """
+        Runs execute_query in a worker thread so the event loop stays free.
+        """
+        return await asyncio.to_thread(self.execute_query, query)
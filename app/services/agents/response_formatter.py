@@ -1,48 +1,51 @@
-import os
-from typing import List, Dict, Any
-from langchain_groq import ChatGroq
+from typing import AsyncIterator, Dict, Any
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from llm_registry import get_llm
+from result_formatter import format_result, summarize_for_prompt
 
-class ResponseFormatterAgent:
-    @staticmethod
-    def format_response(query: str, results: List[Dict[str, Any]]) -> str:
-        """
-        Format query results using Groq API with error handling.
-        """
-        try:
-            llm = ChatGroq(
-                temperature=0.3,
-                model_name="llama3-70b-8192",
-                groq_api_key=os.getenv("GROQ_KEY")
-            )
+RESPONSE_PROMPT = PromptTemplate.from_template("""
+    Summarize the query results into a **direct, insightful response** 
+    without unnecessary introductions or filler text.
 
-            response_prompt = PromptTemplate.from_template("""
-                Summarize the query results into a **direct, insightful response** 
-                without unnecessary introductions or filler text.
+    **Query:** {query}  
+    **Results:** {results}  
 
-                **Query:** {query}  
-                **Results:** {results}  
+    Ensure the response is **concise, structured, and informative**.
+""")
 
-                Ensure the response is **concise, structured, and informative**.
-            """)
+class ResponseFormatterAgent:
+    def __init__(self):
+        self.chain = RESPONSE_PROMPT | get_llm(temperature=0.3) | StrOutputParser()
 
-            chain = response_prompt | llm | StrOutputParser()
+    async def stream_response(self, query: str, results: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Format query results using Groq API with error handling, streaming
+        the answer chunk by chunk as the model produces it.
+        Simple result shapes are rendered locally by format_result; the LLM
+        only sees a bounded summary of larger results.
+        """
+        local_response = format_result(results)
+        if local_response is not None:
+            yield local_response
+            return
 
-            response = chain.invoke({
+        produced = False
+        try:
+            async for chunk in self.chain.astream({
                 "query": query,
-                "results": str(results)
-            })
+                "results": summarize_for_prompt(results)
+            }):
+                produced = produced or bool(chunk.strip())
+                yield chunk
 
-            if not response:
+            if not produced:
                 raise ValueError("Generated response is empty or invalid.")
 
-            return response.strip()
-
         except ValueError as ve:
             print(f"ValueError: {ve}")
-            return "Unable to format results. Please try again."
+            yield "Unable to format results. Please try again."
 
         except Exception as e:
             print(f"Error formatting response: {e}")
-            return "An error occurred while processing your request. Please contact support."
+            yield "An error occurred while processing your request. Please contact support."
@@ -1,9 +1,28 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 import pandas as pd
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi import Query  
+from typing import Any, AsyncIterator, Dict, Optional
+import orjson
 
 from utils import convert_all_columns_to_snake_case
+from dataset_cache import load_dataset, load_derived_arrays, dataset_version
+from filter_index import FilterIndex
+from dashboard_summary import summarize_rows
+from rollup_cube import RollupCube, build_order_sketches
+from sketches import HLL_PRECISION
+from serializers import negotiate_format, frame_response, json_response, iter_ndjson, preferred_encoding, NDJSON_MEDIA_TYPE
+from response_cache import ResponseCache
+from sqlite_loader import sync_table
+from sqlite_indexer import ensure_indexes
+from adaptive_indexer import AdaptiveIndexer
+from sqlite_pool import ReadOnlyPool
+from llm_registry import close_clients
+from translation_cache import TranslationCache, schema_version, schema_vocabulary
+from sql_result_cache import SQLResultCache
+from intent_classifier import LocalIntentClassifier
+from value_index import load_value_index, indexable_columns
+from pagination import encode_cursor, decode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, STREAM_BATCH_SIZE
 
 from agents.intent import IntentAgent
 from agents.ecommerce_assistant import NormalEcommerceAssistantAgent
@@ -13,7 +32,8 @@ from agents.query_generator import SQLQueryAgent
 from agents.infer_schema import SchemaInferenceAgent
 
 import os
-import sqlite3
+import asyncio
+import logging
 from dotenv import load_dotenv
 from pydantic import BaseModel
 
@@ -21,130 +41,372 @@ app = FastAPI()
 
 load_dotenv()
 
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
 CSV_PATH = '../../data/raw/sample_data.csv'
+DATA_PATH = '../../data/raw/data.csv'
 DB_PATH = 'sales_database.sqlite'
+DATE_FORMAT = 'ISO8601'
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", 'translation_cache.sqlite')
 
 try:
     schema_agent = SchemaInferenceAgent(CSV_PATH)
     schema = schema_agent.infer_schema()
 
-    df_chunks = pd.read_csv(CSV_PATH, chunksize=1000)
-    df = pd.concat(chunk for chunk in df_chunks)
+    df = load_dataset(CSV_PATH)
     df = convert_all_columns_to_snake_case(df)
-    conn = sqlite3.connect(DB_PATH)
     TABLE_NAME = "sales_table"
-    df.to_sql(TABLE_NAME, conn, if_exists='replace', index=False, method="multi")
-    conn.close()
+    sync_result = sync_table(DB_PATH, TABLE_NAME, df, CSV_PATH)
+    index_report = ensure_indexes(DB_PATH, TABLE_NAME, schema, analyze=sync_result != "unchanged")
+    adaptive_indexer = AdaptiveIndexer(
+        DB_PATH, TABLE_NAME,
+        threshold=int(os.getenv("ADAPTIVE_INDEX_THRESHOLD", 3)),
+        max_indexes=int(os.getenv("ADAPTIVE_INDEX_MAX_COUNT", 8)),
+        max_bytes=int(float(os.getenv("ADAPTIVE_INDEX_MAX_MB", 64)) * 1024 * 1024)
+    )
+    query_pool = ReadOnlyPool(DB_PATH, size=int(os.getenv("SQL_POOL_SIZE", 4)))
+    translation_cache = TranslationCache(
+        TRANSLATION_CACHE_PATH, schema_version(schema, TABLE_NAME),
+        vocabulary=schema_vocabulary(schema),
+        max_entries=int(os.getenv("TRANSLATION_CACHE_ENTRIES", 5000)),
+        similarity=float(os.getenv("TRANSLATION_CACHE_SIMILARITY", 0.9)) or None
+    )
+    value_index = load_value_index(
+        CSV_PATH, df, indexable_columns(schema, max_distinct=int(os.getenv("VALUE_INDEX_MAX_DISTINCT", 50000)))
+    )
 except Exception as e:
     print(f"Error during initialization: {e}")
     exit(1)
 
 intent_agent = IntentAgent()
+intent_classifier = LocalIntentClassifier(schema, threshold=float(os.getenv("LOCAL_INTENT_THRESHOLD", 0.8)))
+SPECULATIVE_SQL = os.getenv("CHAT_SPECULATIVE_SQL", "1") != "0"
+speculation_stats = {"used": 0, "discarded": 0}
 normal_assistant = NormalEcommerceAssistantAgent()
 memory_agent = ConversationMemoryAgent()
+sql_agent = SQLQueryAgent(
+    schema, DB_PATH, pool=query_pool,
+    timeout_seconds=float(os.getenv("SQL_TIMEOUT_SECONDS", 5)),
+    max_rows=int(os.getenv("SQL_MAX_ROWS", 1000)),
+    translation_cache=translation_cache,
+    result_cache=SQLResultCache(
+        max_entries=int(os.getenv("SQL_RESULT_CACHE_ENTRIES", 512)),
+        max_bytes=int(float(os.getenv("SQL_RESULT_CACHE_MB", 128)) * 1024 * 1024)
+    ),
+    table_name=TABLE_NAME,
+    schema_token_budget=int(os.getenv("SCHEMA_PROMPT_TOKENS", 400)),
+    value_index=value_index
+)
+response_agent = ResponseFormatterAgent()
+
+@app.on_event("shutdown")
+async def shutdown_llm_clients():
+    await close_clients()
+    translation_cache.flush()
 
 class ChatRequest(BaseModel):
     query: str
 
+async def chat_events(user_query: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Runs the chat pipeline and yields its progress as events, in order:
+    - {"event": "intent", "intent": ..., "source": "local" | "llm", "confidence": ...}
+    - for query intents: {"event": "sql", "sql": ...} then {"event": "results", "results": ...}
+    - {"event": "token", "text": ...} for each chunk of the answer as the model produces it
+    - {"event": "done", "response": ...} with the full answer, once it is stored in memory
+
+    When the intent has to come from IntentAgent and SPECULATIVE_SQL is on,
+    SQL generation starts at the same time; its result is used (and only
+    then stored in the translation cache) if the intent is 'query', and it
+    is cancelled otherwise or when the client goes away.
+    """
+    context = memory_agent.get_context()
+    sql_task = None
+    try:
+        local_intent = intent_classifier.classify(user_query)
+        if local_intent["intent"] is not None:
+            intent, source, confidence = local_intent["intent"], "local", local_intent["confidence"]
+        else:
+            if SPECULATIVE_SQL:
+                intent_confirmed = asyncio.get_running_loop().create_future()
+                sql_task = asyncio.create_task(
+                    sql_agent.generate_sql_query(user_query, TABLE_NAME, store_when=intent_confirmed)
+                )
+            intent_classification = await intent_agent.classify_intent(user_query)
+            intent, source, confidence = intent_classification.intent, "llm", None
+        yield {"event": "intent", "intent": intent, "source": source, "confidence": confidence}
+
+        is_query = intent.lower() == 'query'
+        if sql_task is not None:
+            speculation_stats["used" if is_query else "discarded"] += 1
+            if is_query:
+                intent_confirmed.set_result(True)
+            else:
+                sql_task.cancel()
+                await asyncio.gather(sql_task, return_exceptions=True)
+                sql_task = None
+
+        if is_query:
+            if sql_task is not None:
+                sql_query = await sql_task
+            else:
+                sql_query = await sql_agent.generate_sql_query(user_query, TABLE_NAME)
+            adaptive_indexer.observe(sql_query)
+            yield {"event": "sql", "sql": sql_query}
+
+            query_results = await sql_agent.aexecute_query(sql_query)
+            if "error" in query_results:
+                await asyncio.to_thread(translation_cache.discard, user_query, sql_query)
+            yield {"event": "results", "results": query_results}
+            chunks = response_agent.stream_response(user_query, query_results)
+        else:
+            chunks = normal_assistant.stream_response(user_query, context)
+
+        parts = []
+        async for chunk in chunks:
+            parts.append(chunk)
+            yield {"event": "token", "text": chunk}
+
+        final_response = "".join(parts).strip()
+        memory_agent.add_interaction(user_query, final_response)
+        yield {"event": "done", "response": final_response}
+    finally:
+        if sql_task is not None and not sql_task.done():
+            sql_task.cancel()
+
 @app.post('/chat')
 async def chat(request: ChatRequest):
     user_query = request.query
     if not user_query:
         raise HTTPException(status_code=400, detail="No query provided")
 
-    context = memory_agent.get_context()
-    
     try:
-        intent_classification = intent_agent.classify_intent(user_query)
-
-        if intent_classification.intent.lower() == 'query':
-            sql_agent = SQLQueryAgent(schema, DB_PATH)
-            sql_query = sql_agent.generate_sql_query(user_query, TABLE_NAME)
-            query_results = sql_agent.execute_query(sql_query)
-
-            response_agent = ResponseFormatterAgent()
-            final_response = response_agent.format_response(user_query, query_results)
-
-            memory_agent.add_interaction(user_query, final_response)
-            return JSONResponse(content={"intent": intent_classification.intent, "response": final_response, "results": query_results}, status_code=200)
-        else:
-            general_response = normal_assistant.generate_response(user_query, context)
-            memory_agent.add_interaction(user_query, general_response)
-            return JSONResponse(content={"intent": intent_classification.intent, "response": general_response}, status_code=200)
+        content = {}
+        async for event in chat_events(user_query):
+            if event["event"] == "intent":
+                content["intent"] = event["intent"]
+            elif event["event"] == "results":
+                content["results"] = event["results"]
+            elif event["event"] == "done":
+                content["response"] = event["response"]
+        return JSONResponse(content=content, status_code=200)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post('/chat/stream')
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /chat: the chat_events() of the pipeline as NDJSON,
+    one event per line, flushed as soon as each is available. A failure
+    mid-stream ends it with {"event": "error", "detail": ...}.
+    """
+    user_query = request.query
+    if not user_query:
+        raise HTTPException(status_code=400, detail="No query provided")
+
+    async def stream():
+        try:
+            async for event in chat_events(user_query):
+                yield orjson.dumps(event) + b"\n"
+        except Exception as e:
+            print(f"Chat stream error: {e}")
+            yield orjson.dumps({"event": "error", "detail": str(e)}) + b"\n"
+
+    return StreamingResponse(stream(), media_type=NDJSON_MEDIA_TYPE, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get('/chat/stats')
+def chat_stats():
+    """Return hit/miss statistics of the chat pipeline caches, the startup index coverage report and what the adaptive indexer has built."""
+    return {
+        "intent_classifier": intent_classifier.stats(),
+        "speculative_sql": dict(speculation_stats),
+        "translation_cache": translation_cache.stats(),
+        "sql_result_cache": sql_agent.result_cache.stats(),
+        "value_index": value_index.stats(),
+        "sql_indexes": index_report,
+        "adaptive_indexer": adaptive_indexer.stats()
+    }
+
 try:
-    df = pd.read_csv("../../data/raw/data.csv", low_memory=False)
-    df["created_at"] = pd.to_datetime(df["created_at"]) 
+    df = load_dataset(DATA_PATH, parse_dates=["created_at"], date_format=DATE_FORMAT, sort_by="created_at")
+    data_version = dataset_version(DATA_PATH)
+    filter_index = FilterIndex(df)
+    order_sketches = load_derived_arrays(DATA_PATH, f"item_id_hll_p{HLL_PRECISION}", lambda: build_order_sketches(df))
+    rollup_cube = RollupCube(df, sketches=order_sketches)
 except Exception as e:
     raise RuntimeError(f"Error loading data: {str(e)}")
 
+def build_filter_options():
+    """Return unique order statuses and min/max created_at dates, or None if the data lacks them."""
+    if df.empty or "created_at" not in df.columns or "order_status" not in df.columns:
+        return None
+
+    return {
+        "order_statuses": df["order_status"].dropna().unique().tolist(),
+        "start_date": df["created_at"].dropna().min().strftime("%Y-%m-%d"),
+        "end_date": df["created_at"].dropna().max().strftime("%Y-%m-%d")
+    }
+
+filter_options = build_filter_options()
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_ENTRIES", 256)),
+    max_bytes=int(float(os.getenv("RESPONSE_CACHE_MB", 32)) * 1024 * 1024),
+    max_entry_bytes=int(float(os.getenv("RESPONSE_CACHE_ENTRY_MB", 2)) * 1024 * 1024),
+    ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL", 300))
+)
+
+def cache_key(endpoint: str, request: Request, *params):
+    """
+    Builds a response cache key from normalized request parameters, the
+    negotiated content encoding and the dataset version.
+    """
+    return (endpoint, data_version, preferred_encoding(request.headers.get("accept-encoding")), *params)
+
+def filter_key(start_date, end_date, statuses):
+    return (start_date.isoformat(), end_date.isoformat(), tuple(sorted(set(statuses))))
+
 @app.get("/get_filters")
-def get_order_filters():
+def get_order_filters(request: Request):
     """Return unique order statuses and min/max created_at dates."""
-    try:
-        if df.empty or "created_at" not in df.columns or "order_status" not in df.columns:
-            raise HTTPException(status_code=500, detail="Data is missing required columns")
+    if filter_options is None:
+        raise HTTPException(status_code=500, detail="Data is missing required columns")
+
+    return response_cache.respond(
+        request, cache_key("get_filters", request), lambda: JSONResponse(content=filter_options)
+    )
 
-        order_statuses = df["order_status"].dropna().unique().tolist()  
-        start_date = df["created_at"].dropna().min().strftime("%Y-%m-%d")
-        end_date = df["created_at"].dropna().max().strftime("%Y-%m-%d")
+def parse_filter_params(start_date: str, end_date: str, order_status: str):
+    """
+    Validates the shared filter parameters and returns (start_date, end_date, statuses).
+    """
+    start_date = pd.to_datetime(start_date, errors="coerce")
+    end_date = pd.to_datetime(end_date, errors="coerce")
 
-        return JSONResponse(content={
-            "order_statuses": order_statuses,
-            "start_date": start_date,
-            "end_date": end_date
-        })
+    if pd.isna(start_date) or pd.isna(end_date):
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date cannot be after end_date")
+
+    statuses = order_status.split(",")
+
+    invalid_statuses = [s for s in statuses if s not in filter_index.valid_statuses]
+
+    if invalid_statuses:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid order statuses: {', '.join(invalid_statuses)}"
+        )
+
+    return start_date, end_date, statuses
+
+def parse_fields(fields: Optional[str]):
+    """
+    Validates a comma-separated column projection and returns the column positions to keep.
+    """
+    if not fields:
+        return list(range(len(df.columns)))
+
+    columns = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown_columns = [column for column in columns if column not in df.columns]
+    if unknown_columns:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown_columns)}")
+
+    return [df.columns.get_loc(column) for column in columns]
+
+def iter_filtered_batches(start_date, end_date, statuses, positions, after=None, limit=None):
+    """
+    Yields the matching rows in STREAM_BATCH_SIZE frames, walking the filter index by keyset.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        batch_size = STREAM_BATCH_SIZE if remaining is None else min(STREAM_BATCH_SIZE, remaining)
+        rows = filter_index.lookup(start_date, end_date, statuses, after=after, limit=batch_size)
+        if not len(rows):
+            break
+        yield df.iloc[rows, positions]
+        after = int(rows[-1])
+        if remaining is not None:
+            remaining -= len(rows)
 
 @app.get("/get_filtered_data")
 def get_filtered_data(
+    request: Request,
     start_date: str,
     end_date: str,
-    order_status: str = Query(..., description="Comma-separated order statuses")
+    order_status: str = Query(..., description="Comma-separated order statuses"),
+    format: Optional[str] = Query(None, description="records, columns, arrow or ndjson; overrides the Accept header"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return (default: all)"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Maximum rows per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page")
 ):
     """
     API endpoint to return filtered sales data based on date range and order status.
+    The body format is negotiated from the Accept header (JSON records by
+    default, column-oriented JSON, an Arrow IPC stream or NDJSON) and
+    compressed with zstd or gzip according to Accept-Encoding.
+
+    Results are paged by keyset: each page holds at most `limit` rows
+    (DEFAULT_PAGE_SIZE when only a cursor is given) and the X-Next-Cursor
+    header, also returned as next_cursor in JSON bodies, fetches the next one.
+
+    Requests without `limit` or `cursor` still get every matching row in
+    one response, but only up to DEFAULT_PAGE_SIZE rows; larger results are
+    refused with 413 instead of being built in memory, and callers should
+    page with `limit` or stream with format=ndjson. NDJSON streams every
+    remaining row in batches, or `limit` rows with X-Next-Cursor when more remain.
     """
     try:
-        start_date = pd.to_datetime(start_date, errors="coerce")
-        end_date = pd.to_datetime(end_date, errors="coerce")
-
-        if pd.isna(start_date) or pd.isna(end_date):
-            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
-
-        if start_date > end_date:
-            raise HTTPException(status_code=400, detail="start_date cannot be after end_date")
-
-        statuses = order_status.split(",")
-
-        valid_statuses = df["order_status"].dropna().unique().tolist()
-        invalid_statuses = [s for s in statuses if s not in valid_statuses]
-
-        if invalid_statuses:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid order statuses: {', '.join(invalid_statuses)}"
-            )
-
-        filtered_df = df.loc[
-            (df["created_at"].between(start_date, end_date)) &
-            (df["order_status"].isin(statuses))
-        ]
-
-        if filtered_df.empty:
-            return JSONResponse(
-                content={"message": "No data found for the given filters", "data": []},
-                status_code=200
+        start_date, end_date, statuses = parse_filter_params(start_date, end_date, order_status)
+        fmt = negotiate_format(request.headers.get("accept"), format)
+        positions = parse_fields(fields)
+        try:
+            after = decode_cursor(cursor, data_version)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        if fmt == "ndjson":
+            headers = None
+            if limit is not None:
+                rows = filter_index.lookup(start_date, end_date, statuses, after=after, limit=limit + 1)
+                if len(rows) > limit:
+                    headers = {"X-Next-Cursor": encode_cursor(rows[limit - 1], data_version)}
+            batches = iter_filtered_batches(start_date, end_date, statuses, positions, after=after, limit=limit)
+            return StreamingResponse(iter_ndjson(batches), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+        if limit is None and cursor is None:
+            matching = filter_index.lookup(start_date, end_date, statuses, limit=DEFAULT_PAGE_SIZE + 1)
+            if len(matching) > DEFAULT_PAGE_SIZE:
+                raise HTTPException(
+                    status_code=413,
+                    detail=(
+                        f"More than {DEFAULT_PAGE_SIZE} rows match these filters. Page through them with "
+                        f"limit (up to {MAX_PAGE_SIZE}) and next_cursor, or stream them with format=ndjson."
+                    )
+                )
+
+        page_size = limit or DEFAULT_PAGE_SIZE
+
+        def build_page():
+            rows = filter_index.lookup(start_date, end_date, statuses, after=after, limit=page_size + 1)
+            next_cursor = encode_cursor(rows[page_size - 1], data_version) if len(rows) > page_size else None
+            filtered_df = df.iloc[rows[:page_size], positions]
+
+            message = "Success" if len(filtered_df) else "No data found for the given filters"
+            headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+            return frame_response(
+                filtered_df, fmt, message, request.headers.get("accept-encoding"),
+                extra={"next_cursor": next_cursor}, headers=headers
             )
 
-        filtered_df["created_at"] = filtered_df["created_at"].astype(str)  
-
-        filtered_data = filtered_df.fillna("").to_dict(orient="records")  
-        return JSONResponse(content={"message": "Success", "data": filtered_data}, status_code=200)
+        key = cache_key(
+            "get_filtered_data", request, *filter_key(start_date, end_date, statuses),
+            fmt, tuple(positions), page_size, after
+        )
+        return response_cache.respond(request, key, build_page)
 
     except HTTPException as e:
         print("HTTPException:", e)
@@ -153,7 +415,44 @@ def get_filtered_data(
         print("Exception:", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/dashboard_summary")
+def get_dashboard_summary(
+    request: Request,
+    start_date: str,
+    end_date: str,
+    order_status: str = Query(..., description="Comma-separated order statuses"),
+    exact_orders: bool = Query(False, description="Count distinct orders exactly instead of from sketches")
+):
+    """
+    API endpoint to return the dashboard KPIs and chart series for a filter,
+    aggregated server-side so the client never receives raw rows.
+    Whole-day ranges are answered from the rollup cube; anything else falls
+    back to aggregating the matching rows.
+    """
+    try:
+        start_date, end_date, statuses = parse_filter_params(start_date, end_date, order_status)
+
+        def build_summary():
+            if rollup_cube.can_answer(start_date, end_date):
+                summary = rollup_cube.summarize(start_date, end_date, statuses)
+                if exact_orders and summary["total_orders"]:
+                    rows = filter_index.lookup(start_date, end_date, statuses)
+                    summary["total_orders"] = int(df["item_id"].iloc[rows].nunique())
+                    summary["total_orders_error"] = 0.0
+            else:
+                summary = summarize_rows(df, filter_index.lookup(start_date, end_date, statuses))
+            message = "Success" if summary["trend"]["created_at"] else "No data found for the given filters"
+            return json_response({"message": message, **summary}, request.headers.get("accept-encoding"))
+
+        key = cache_key("dashboard_summary", request, *filter_key(start_date, end_date, statuses), exact_orders)
+        return response_cache.respond(request, key, build_summary)
 
+    except HTTPException as e:
+        print("HTTPException:", e)
+        raise
+    except Exception as e:
+        print("Exception:", e)
+        raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
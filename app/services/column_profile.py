@@ -0,0 +1,115 @@
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from sketches import build_registers, estimate_cardinality
+
+RESERVOIR_SIZE = 1_000
+EXACT_DISTINCT_LIMIT = 4_096
+
+
+class ColumnProfile:
+    """
+    Single-pass summary of one column, updated one chunk at a time:
+    - a uniform reservoir sample of the non-null values
+    - the distinct count, exact up to EXACT_DISTINCT_LIMIT values and
+      estimated with a HyperLogLog sketch beyond that
+    - count, mean, variance (merged with Chan's parallel update), min and
+      max of the values, as long as every one of them parses as a number
+    """
+
+    def __init__(self, reservoir_size: int = RESERVOIR_SIZE, seed: int = 0):
+        self.reservoir_size = reservoir_size
+        self.rng = np.random.default_rng(seed)
+        self.reservoir: List[Any] = []
+        self.non_null = 0
+
+        self.distinct: Optional[set] = set()
+        self.registers: Optional[np.ndarray] = None
+
+        self.numeric = True
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, series: pd.Series) -> None:
+        values = series.dropna()
+        if values.empty:
+            return
+        self._sample(values.to_numpy(dtype=object))
+        self._count_distinct(pd.unique(values.to_numpy(dtype=object)))
+        if self.numeric:
+            self._accumulate(values)
+
+    def _sample(self, values: np.ndarray) -> None:
+        """
+        Reservoir sampling (Algorithm R): the i-th value replaces a random
+        slot with probability reservoir_size / (i + 1).
+        """
+        free = self.reservoir_size - len(self.reservoir)
+        if free > 0:
+            self.reservoir.extend(values[:free].tolist())
+        start = self.non_null + max(free, 0)
+        rest = values[max(free, 0):]
+        self.non_null += len(values)
+        if not len(rest):
+            return
+
+        slots = self.rng.integers(0, np.arange(start, start + len(rest)) + 1)
+        for position in np.flatnonzero(slots < self.reservoir_size):
+            self.reservoir[slots[position]] = rest[position]
+
+    def _count_distinct(self, uniques: np.ndarray) -> None:
+        if self.distinct is not None:
+            self.distinct.update(uniques.tolist())
+            if len(self.distinct) <= EXACT_DISTINCT_LIMIT:
+                return
+            uniques = np.array(list(self.distinct), dtype=object)
+            self.distinct = None
+
+        registers = build_registers(uniques.astype(str), np.zeros(len(uniques), dtype=np.intp), 1)[0]
+        self.registers = registers if self.registers is None else np.maximum(self.registers, registers)
+
+    def _accumulate(self, values: pd.Series) -> None:
+        numbers = pd.to_numeric(values, errors="coerce")
+        if numbers.isna().any():
+            self.numeric = False
+            return
+
+        numbers = numbers.to_numpy(dtype=np.float64)
+        count = len(numbers)
+        mean = float(numbers.mean())
+        m2 = float(((numbers - mean) ** 2).sum())
+
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, float(numbers.min()))
+        self.max = max(self.max, float(numbers.max()))
+
+    def distinct_count(self) -> int:
+        if self.distinct is not None:
+            return len(self.distinct)
+        return int(round(estimate_cardinality(self.registers)))
+
+    def examples(self, limit: int) -> List[Any]:
+        """
+        Returns up to `limit` distinct values from the sample, in sample order.
+        """
+        return list(dict.fromkeys(self.reservoir))[:limit]
+
+    def numeric_stats(self) -> Dict[str, Optional[float]]:
+        if not self.count:
+            return {"min": None, "max": None, "mean": None, "std": None}
+        return {
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "std": math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else None,
+        }
@@ -0,0 +1,58 @@
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+SUMMARY_COLUMNS = ["created_at", "grand_total", "product_category", "item_id"]
+
+
+def empty_summary() -> Dict[str, Any]:
+    return {
+        "trend": {"created_at": [], "grand_total": []},
+        "categories": {"product_category": [], "grand_total": []},
+        "total_sales": 0.0,
+        "total_orders": 0,
+        "total_orders_error": 0.0,
+        "avg_order_value": 0.0,
+    }
+
+
+def summarize_rows(df: pd.DataFrame, rows: np.ndarray) -> Dict[str, Any]:
+    """
+    Aggregates the selected rows into everything the dashboard renders:
+    - the daily sales trend (one point per calendar day, gaps filled with 0)
+    - sales per product category, largest first
+    - total sales, distinct orders and average order value
+
+    total_orders_error is the relative standard error of total_orders,
+    0.0 here because rows are counted exactly.
+    """
+    if len(rows) == 0:
+        return empty_summary()
+
+    positions = [df.columns.get_loc(column) for column in SUMMARY_COLUMNS]
+    subset = df.iloc[rows, positions]
+    grand_total = pd.to_numeric(subset["grand_total"], errors="coerce").fillna(0)
+
+    trend = grand_total.groupby(subset["created_at"].dt.floor("D")).sum()
+    trend = trend.resample("D").sum()
+    categories = (
+        grand_total.groupby(subset["product_category"], observed=True)
+        .sum()
+        .sort_values(ascending=False)
+    )
+
+    return {
+        "trend": {
+            "created_at": trend.index.strftime("%Y-%m-%d").tolist(),
+            "grand_total": trend.tolist(),
+        },
+        "categories": {
+            "product_category": categories.index.astype(str).tolist(),
+            "grand_total": categories.tolist(),
+        },
+        "total_sales": float(grand_total.sum()),
+        "total_orders": int(subset["item_id"].nunique()),
+        "total_orders_error": 0.0,
+        "avg_order_value": float(grand_total.mean()),
+    }
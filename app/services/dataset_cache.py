@@ -0,0 +1,416 @@
+import os
+import json
+import uuid
+import shutil
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR_NAME = ".cache"
+CACHE_FORMAT_VERSION = 3
+MANIFEST_NAME = "manifest.json"
+LOCK_SUFFIX = ".lock"
+BUILD_ATTEMPTS = 2
+DERIVED_DIR_NAME = "derived"
+HASH_BLOCK_SIZE = 1 << 20
+CATEGORICAL_MAX_RATIO = 0.5
+
+
+def file_fingerprint(path: str) -> Dict[str, Any]:
+    """
+    Returns the size, modification time and SHA-256 content hash of a file.
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def prefix_sha256(path: str, size: int) -> str:
+    """
+    Returns the SHA-256 hash of the first `size` bytes of a file, which
+    matches the stored hash of an older version if the file only grew by appending.
+    """
+    digest = hashlib.sha256()
+    remaining = size
+    with open(path, "rb") as source:
+        while remaining > 0:
+            block = source.read(min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def cache_dir_for(path: str) -> str:
+    """
+    Returns the directory holding the columnar cache of a source file.
+    The cache lives next to the source, e.g. data/raw/.cache/data.csv/.
+    """
+    path = os.path.abspath(path)
+    return os.path.join(os.path.dirname(path), CACHE_DIR_NAME, os.path.basename(path))
+
+
+def _read_source(path: str) -> pd.DataFrame:
+    if path.lower().endswith((".xlsx", ".xls")):
+        return pd.read_excel(path)
+    return pd.read_csv(path, low_memory=False)
+
+
+def _parse_dates(df: pd.DataFrame, parse_dates: List[str], date_format: Optional[str]) -> pd.DataFrame:
+    for column in parse_dates:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format=date_format)
+    return df
+
+
+def _downcast_numeric(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_bool_dtype(series.dtype):
+        return series
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return pd.to_numeric(series, downcast="integer")
+
+    values = series.to_numpy(dtype=np.float64)
+    if (
+        not series.hasnans
+        and np.all(np.abs(values) < 2 ** 53)
+        and np.array_equal(values, np.trunc(values))
+    ):
+        return pd.to_numeric(series.astype(np.int64), downcast="integer")
+
+    # Only narrow floats when every value survives the round trip,
+    # so sums over prices and totals stay exact.
+    narrowed = series.astype(np.float32)
+    if np.array_equal(narrowed.to_numpy(dtype=np.float64), values, equal_nan=True):
+        return narrowed
+    return series
+
+
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrinks the in-memory footprint of a frame without changing its values:
+    - low-cardinality text columns become categoricals (dictionary-encoded)
+    - integers and integral floats are downcast to the smallest integer type
+    - other floats are narrowed to float32 only when that is lossless
+    Memory usage before and after is logged.
+    """
+    before = df.memory_usage(deep=True).sum()
+
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            df[column] = _downcast_numeric(series)
+        elif series.dtype == object and len(series):
+            if series.nunique(dropna=True) / len(series) <= CATEGORICAL_MAX_RATIO:
+                df[column] = series.astype("category")
+
+    after = df.memory_usage(deep=True).sum()
+    logging.info(
+        f"Optimized dtypes: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+        f"({before / max(after, 1):.1f}x smaller)"
+    )
+    return df
+
+
+def _write_columns(df: pd.DataFrame, target_dir: str, source_dtypes: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Writes every column of the frame as a standalone .npy file, recording
+    the dtype the column had before optimize_dtypes().
+    Datetimes are stored as int64 nanoseconds, categoricals as their codes
+    and other text columns as int32 dictionary codes, each with a JSON list
+    of the distinct values, so every file on disk is a plain fixed-width
+    array that can be memory-mapped.
+    """
+    columns = []
+    for position, name in enumerate(df.columns):
+        series = df[name]
+        entry: Dict[str, Any] = {"name": name, "file": f"col_{position}.npy", "source_dtype": source_dtypes[name]}
+
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            entry["kind"] = "datetime"
+            entry["tz"] = str(series.dt.tz) if series.dt.tz is not None else None
+            values = series.dt.tz_convert("UTC").dt.tz_localize(None) if entry["tz"] else series
+            data = values.to_numpy(dtype="datetime64[ns]").view("i8")
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            entry["kind"] = "category"
+            data = series.cat.codes.to_numpy()
+            entry["categories_file"] = f"col_{position}.categories.json"
+            with open(os.path.join(target_dir, entry["categories_file"]), "w") as fh:
+                json.dump(series.cat.categories.tolist(), fh)
+        elif pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+            entry["kind"] = "numeric"
+            data = series.to_numpy()
+        else:
+            entry["kind"] = "object"
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            data = codes.astype(np.int32)
+            entry["categories_file"] = f"col_{position}.categories.json"
+            with open(os.path.join(target_dir, entry["categories_file"]), "w") as fh:
+                json.dump(pd.Index(uniques).tolist(), fh)
+
+        np.save(os.path.join(target_dir, entry["file"]), np.ascontiguousarray(data), allow_pickle=False)
+        columns.append(entry)
+    return columns
+
+
+def _read_manifest(cache_dir: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(cache_dir, MANIFEST_NAME)) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+@contextmanager
+def _build_lock(target_dir: str) -> Iterator[None]:
+    """
+    Serializes checking and (re)building target_dir across processes with
+    an flock on a sibling lock file, so only one worker builds a cache and
+    the others wait and then load it. Without fcntl (Windows) there is no
+    lock and concurrent builds are resolved by _publish alone.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(target_dir), exist_ok=True)
+    with open(target_dir + LOCK_SUFFIX, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _publish(staging_dir: str, target_dir: str) -> bool:
+    """
+    Replaces target_dir with a fully written staging_dir. The old directory
+    is renamed aside first and removed afterwards, so target_dir is only
+    missing between two renames, and memory maps into the old files stay valid.
+
+    Returns False when staging_dir could not be moved into place (it is removed).
+    """
+    retired_dir = f"{target_dir}.retired-{uuid.uuid4().hex}"
+    try:
+        os.rename(target_dir, retired_dir)
+    except FileNotFoundError:
+        retired_dir = None
+
+    try:
+        os.rename(staging_dir, target_dir)
+        published = True
+    except OSError:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        published = False
+
+    if retired_dir is not None:
+        shutil.rmtree(retired_dir, ignore_errors=True)
+    return published
+
+
+def _manifest_matches(manifest: Optional[Dict[str, Any]], fingerprint: Dict[str, Any], options: Dict[str, Any]) -> bool:
+    return (
+        manifest is not None
+        and manifest.get("format_version") == CACHE_FORMAT_VERSION
+        and manifest.get("source") == fingerprint
+        and manifest.get("options") == options
+    )
+
+
+def _build_cache(path: str, cache_dir: str, fingerprint: Dict[str, Any], options: Dict[str, Any]) -> None:
+    df = _read_source(path)
+    df = _parse_dates(df, options["parse_dates"], options["date_format"])
+    source_dtypes = {name: str(df[name].dtype) for name in df.columns}
+    if options["optimize"]:
+        df = optimize_dtypes(df)
+    if options["sort_by"]:
+        df = df.sort_values(options["sort_by"], kind="stable", na_position="last", ignore_index=True)
+
+    parent = os.path.dirname(cache_dir)
+    os.makedirs(parent, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix=".build-", dir=parent)
+    try:
+        manifest = {
+            "format_version": CACHE_FORMAT_VERSION,
+            "source": fingerprint,
+            "options": options,
+            "rows": len(df),
+            "columns": _write_columns(df, staging_dir, source_dtypes),
+        }
+        with open(os.path.join(staging_dir, MANIFEST_NAME), "w") as fh:
+            json.dump(manifest, fh)
+
+        _publish(staging_dir, cache_dir)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+
+def _load_columns(cache_dir: str, manifest: Dict[str, Any]) -> pd.DataFrame:
+    columns = {}
+    for entry in manifest["columns"]:
+        # np.asarray drops the np.memmap subclass but keeps the mapped buffer.
+        data = np.asarray(np.load(os.path.join(cache_dir, entry["file"]), mmap_mode="r", allow_pickle=False))
+
+        if entry["kind"] == "datetime":
+            values = pd.Series(data.view("datetime64[ns]"), copy=False)
+            if entry.get("tz"):
+                values = values.dt.tz_localize("UTC").dt.tz_convert(entry["tz"])
+        elif entry["kind"] == "category":
+            with open(os.path.join(cache_dir, entry["categories_file"])) as fh:
+                categories = json.load(fh)
+            values = pd.Series(pd.Categorical.from_codes(data, categories), copy=False)
+        elif entry["kind"] == "object":
+            with open(os.path.join(cache_dir, entry["categories_file"])) as fh:
+                categories = json.load(fh)
+            # Code -1 marks a missing value and picks the trailing NaN.
+            lookup = np.array(categories + [np.nan], dtype=object)
+            decoded = lookup[data]
+            decoded.setflags(write=False)
+            values = pd.Series(decoded, copy=False)
+        else:
+            values = pd.Series(data, copy=False)
+
+        columns[entry["name"]] = values
+
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_dataset(
+    path: str,
+    parse_dates: Optional[List[str]] = None,
+    date_format: Optional[str] = None,
+    optimize: bool = True,
+    sort_by: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Loads a CSV/XLSX file through a typed columnar cache.
+
+    The first load parses the source and writes one .npy file per column
+    under cache_dir_for(path). Later loads memory-map those files instead of
+    re-parsing text, as long as the source size, mtime and content hash and
+    the load options still match the cache manifest. Workers loading the
+    same source wait on a lock file beside the cache while one of them builds it.
+
+    Args:
+        path (str): Path to the raw CSV or XLSX file.
+        parse_dates (list): Columns to convert to datetime before caching.
+        date_format (str): Optional explicit format used for parse_dates.
+        optimize (bool): Run optimize_dtypes() before writing the cache.
+        sort_by (str): Optional column to stably sort the cached rows by (missing values last).
+
+    Returns:
+        pd.DataFrame: The dataset with read-only columns; numeric and datetime
+        columns are backed by memory maps shared through the OS page cache.
+    """
+    options = {
+        "parse_dates": list(parse_dates or []),
+        "date_format": date_format,
+        "optimize": optimize,
+        "sort_by": sort_by,
+    }
+    cache_dir = cache_dir_for(path)
+    fingerprint = file_fingerprint(path)
+
+    with _build_lock(cache_dir):
+        manifest = _read_manifest(cache_dir)
+        attempts = 0
+        while not _manifest_matches(manifest, fingerprint, options):
+            if attempts == BUILD_ATTEMPTS:
+                raise RuntimeError(f"Could not publish the columnar cache for {path} in {cache_dir}")
+            attempts += 1
+            logging.info(f"Building columnar cache for {path}")
+            _build_cache(path, cache_dir, fingerprint, options)
+            manifest = _read_manifest(cache_dir)
+
+        return _load_columns(cache_dir, manifest)
+
+
+def dataset_fingerprint(path: str) -> Dict[str, Any]:
+    """
+    Returns the fingerprint of the currently cached version of a dataset,
+    hashing the source only when it has not been cached yet.
+    """
+    manifest = _read_manifest(cache_dir_for(path))
+    if manifest is not None:
+        return manifest["source"]
+    return file_fingerprint(path)
+
+
+def source_dtypes(path: str) -> List[str]:
+    """
+    Returns the dtypes the columns of the cached dataset had when parsed
+    from the source, in column order, before optimize_dtypes() narrowed
+    them (e.g. 'float64' for a float column now stored as int32).
+    """
+    manifest = _read_manifest(cache_dir_for(path))
+    if manifest is None:
+        return []
+    return [entry.get("source_dtype", "") for entry in manifest["columns"]]
+
+
+def dataset_version(path: str) -> str:
+    """
+    Returns the content hash identifying the currently cached version of a dataset.
+    """
+    return dataset_fingerprint(path)["sha256"]
+
+
+def load_derived_arrays(path: str, name: str, build: Callable[[], Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Loads arrays derived from a dataset (sketches, lookup tables) that are
+    stored alongside its columnar cache. They are rebuilt with build() and
+    rewritten whenever the dataset version changes.
+
+    Args:
+        path (str): Path to the raw source the arrays were derived from.
+        name (str): Name of the derived artifact, unique per source.
+        build (callable): Returns a {array_name: np.ndarray} dict. Arrays must not hold Python objects.
+
+    Returns:
+        dict: The arrays, memory-mapped read-only.
+    """
+    version = dataset_version(path)
+    target_dir = os.path.join(cache_dir_for(path), DERIVED_DIR_NAME, name)
+
+    with _build_lock(target_dir):
+        meta = _read_manifest(target_dir)
+        if meta is None or meta.get("version") != version:
+            arrays = build()
+            parent = os.path.dirname(target_dir)
+            os.makedirs(parent, exist_ok=True)
+            staging_dir = tempfile.mkdtemp(prefix=".build-", dir=parent)
+            try:
+                for array_name, array in arrays.items():
+                    np.save(os.path.join(staging_dir, f"{array_name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+                with open(os.path.join(staging_dir, MANIFEST_NAME), "w") as fh:
+                    json.dump({"version": version, "arrays": list(arrays)}, fh)
+                _publish(staging_dir, target_dir)
+            except Exception:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+            meta = _read_manifest(target_dir)
+            if meta is None or meta.get("version") != version:
+                # Publishing lost a race; serve this build from memory.
+                return arrays
+
+        return {
+            array_name: np.asarray(np.load(os.path.join(target_dir, f"{array_name}.npy"), mmap_mode="r", allow_pickle=False))
+            for array_name in meta["arrays"]
+        }
@@ -0,0 +1,70 @@
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class FilterIndex:
+    """
+    Prebuilt lookup structures for date-range + order-status filters.
+
+    The frame must already be sorted by the date column with missing dates
+    last (see load_dataset(sort_by=...)), so a date range maps to a
+    contiguous [lo, hi) slice found by binary search. Each status keeps
+    the sorted row positions where it occurs, so a query only touches the
+    rows it returns instead of building full-length boolean masks.
+    """
+
+    def __init__(self, df: pd.DataFrame, date_column: str = "created_at", status_column: str = "order_status"):
+        dates = np.asarray(df[date_column].to_numpy(dtype="datetime64[ns]")).view("i8")
+        valid_dates = int((~df[date_column].isna()).sum())
+        self.dates = dates[:valid_dates]
+        if np.any(np.diff(self.dates) < 0):
+            raise ValueError(f"Frame must be sorted by '{date_column}' to build a FilterIndex.")
+
+        groups = df.groupby(status_column, observed=True, sort=False).indices
+        self.status_rows: Dict[str, np.ndarray] = {status: np.asarray(rows) for status, rows in groups.items()}
+        self.valid_statuses: FrozenSet[str] = frozenset(self.status_rows)
+
+    def date_bounds(self, start_date: pd.Timestamp, end_date: pd.Timestamp) -> Tuple[int, int]:
+        """
+        Returns the [lo, hi) row slice whose dates fall within start_date..end_date (inclusive).
+        """
+        lo = int(np.searchsorted(self.dates, pd.Timestamp(start_date).value, side="left"))
+        hi = int(np.searchsorted(self.dates, pd.Timestamp(end_date).value, side="right"))
+        return lo, hi
+
+    def lookup(
+        self,
+        start_date: pd.Timestamp,
+        end_date: pd.Timestamp,
+        statuses: List[str],
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Returns the sorted row positions matching the date range and any of the statuses.
+
+        Args:
+            after (int): Only return positions greater than this one (keyset pagination).
+            limit (int): Return at most this many positions.
+        """
+        lo, hi = self.date_bounds(start_date, end_date)
+        if after is not None:
+            lo = max(lo, after + 1)
+
+        parts = []
+        for status in set(statuses):
+            rows = self.status_rows.get(status)
+            if rows is None:
+                continue
+            first, last = np.searchsorted(rows, [lo, hi], side="left")
+            if limit is not None:
+                last = min(last, first + limit)
+            parts.append(rows[first:last])
+
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        # Statuses are disjoint, so the union is a plain merge of the slices.
+        merged = np.sort(np.concatenate(parts), kind="mergesort")
+        return merged[:limit] if limit is not None else merged
@@ -0,0 +1,117 @@
+import re
+import time
+import threading
+from typing import Any, Dict, Set
+
+CONFIDENCE_THRESHOLD = 0.8
+
+WORD = re.compile(r"[a-z0-9]+")
+YEAR = re.compile(r"^(19|20)\d\d$")
+
+SMALL_TALK = {
+    "hi", "hello", "hey", "hiya", "yo", "thanks", "thank", "thx", "ty", "you", "ok", "okay", "cool", "great",
+    "nice", "bye", "goodbye", "good", "morning", "afternoon", "evening", "night", "how", "are", "who", "what",
+    "can", "do", "there", "cheers", "awesome", "perfect", "got", "it", "see", "ya", "welcome", "sup",
+}
+AGGREGATE_WORDS = {
+    "total", "sum", "count", "average", "avg", "mean", "median", "many", "much", "number", "top", "bottom",
+    "highest", "lowest", "max", "maximum", "min", "minimum", "most", "least", "list", "breakdown", "trend",
+    "distribution", "share", "percentage", "ratio", "rank", "compare",
+}
+MEASURE_WORDS = {
+    "sales", "sale", "revenue", "orders", "order", "customers", "customer", "products", "product", "items",
+    "item", "quantity", "qty", "price", "prices", "discount", "discounts", "refund", "refunds", "commission",
+    "payments", "payment", "categories", "category", "status", "statuses", "value", "sku",
+}
+TIME_WORDS = {
+    "today", "yesterday", "daily", "weekly", "monthly", "yearly", "quarter", "quarterly", "month", "year",
+    "week", "january", "february", "march", "april", "may", "june", "july", "august", "september",
+    "october", "november", "december", "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "oct", "nov", "dec",
+}
+ADVISORY_WORDS = {
+    "why", "should", "strategy", "strategies", "improve", "recommend", "recommendation", "suggest",
+    "suggestion", "advice", "advise", "explain", "idea", "ideas", "tips", "plan", "predict", "forecast",
+}
+GENERIC_SCHEMA_WORDS = {"id", "at", "by", "is", "of", "and", "the", "code", "unknown", "others"}
+
+
+class LocalIntentClassifier:
+    """
+    Rule-based intent classifier that decides the clear cases without a
+    network call, so only ambiguous prompts need IntentAgent:
+    - prompts made only of small talk (greetings, thanks) are 'general'
+    - prompts combining aggregate, measure, time and schema terms (column
+      names and known values from SchemaInferenceAgent) are 'query'
+    - anything advisory ("why", "recommend") or weakly matched is left to the LLM
+
+    classify() returns {'intent': 'query' | 'general' | None, 'confidence': float, 'reason': str},
+    where intent is None when the prompt should go to the LLM.
+    """
+
+    def __init__(self, schema: Dict[str, Any], threshold: float = CONFIDENCE_THRESHOLD):
+        self.threshold = threshold
+        self.schema_terms = self._schema_terms(schema)
+        self.counts = {"query": 0, "general": 0, "llm": 0}
+        self.total_seconds = 0.0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _schema_terms(schema: Dict[str, Any]) -> Set[str]:
+        terms = set()
+        for column, entry in schema.items():
+            terms.update(WORD.findall(str(column).lower()))
+            for value in entry.get("values", []) if isinstance(entry, dict) else []:
+                if isinstance(value, str) and not value[:1].isdigit():
+                    terms.update(WORD.findall(value.lower()))
+        return {term for term in terms if len(term) > 2 and not term.isdigit()} - GENERIC_SCHEMA_WORDS
+
+    def _decide(self, prompt: str) -> Dict[str, Any]:
+        words = WORD.findall(prompt.lower())
+        if not words:
+            return {"intent": "general", "confidence": 1.0, "reason": "empty prompt"}
+
+        if len(words) <= 6 and all(word in SMALL_TALK for word in words):
+            return {"intent": "general", "confidence": 0.97, "reason": "small talk"}
+
+        advisory = [word for word in words if word in ADVISORY_WORDS]
+        if advisory:
+            return {"intent": None, "confidence": 0.5, "reason": f"advisory wording: {', '.join(advisory)}"}
+
+        unique = set(words)
+        aggregates = unique & AGGREGATE_WORDS
+        measures = unique & MEASURE_WORDS
+        schema_hits = unique & self.schema_terms
+        has_time = bool(unique & TIME_WORDS) or any(YEAR.match(word) for word in unique)
+
+        score = min(len(aggregates), 2) + min(len(measures), 2) + min(len(schema_hits - measures), 2) + has_time
+        if aggregates and (measures or schema_hits) and score >= 3:
+            matched = sorted(aggregates | measures | schema_hits)
+            return {
+                "intent": "query",
+                "confidence": round(min(0.99, 0.6 + 0.08 * score), 2),
+                "reason": f"data request terms: {', '.join(matched)}",
+            }
+
+        return {"intent": None, "confidence": 0.5, "reason": "no clear signal"}
+
+    def classify(self, prompt: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = self._decide(prompt)
+        if result["intent"] is not None and result["confidence"] < self.threshold:
+            result = {**result, "intent": None}
+
+        with self.lock:
+            self.counts[result["intent"] or "llm"] += 1
+            self.total_seconds += time.perf_counter() - started
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            total = sum(self.counts.values())
+            return {
+                "local_query": self.counts["query"],
+                "local_general": self.counts["general"],
+                "llm": self.counts["llm"],
+                "local_rate": (self.counts["query"] + self.counts["general"]) / total if total else 0.0,
+                "avg_microseconds": 1e6 * self.total_seconds / total if total else 0.0,
+            }
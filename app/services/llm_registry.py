@@ -0,0 +1,60 @@
+import os
+from functools import lru_cache
+
+import httpx
+from langchain_groq import ChatGroq
+
+MODEL_NAME = "llama3-70b-8192"
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 60))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 20))
+LLM_KEEPALIVE_SECONDS = 120
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_SECONDS,
+    )
+
+
+@lru_cache(maxsize=None)
+def http_client() -> httpx.Client:
+    """
+    The process-wide HTTP client for synchronous LLM calls. Its pooled
+    keep-alive connections let consecutive calls skip the TCP and TLS handshakes.
+    """
+    return httpx.Client(limits=_limits(), timeout=LLM_TIMEOUT_SECONDS)
+
+
+@lru_cache(maxsize=None)
+def async_http_client() -> httpx.AsyncClient:
+    """
+    The process-wide HTTP client for async LLM calls (ainvoke/astream).
+    """
+    return httpx.AsyncClient(limits=_limits(), timeout=LLM_TIMEOUT_SECONDS)
+
+
+@lru_cache(maxsize=None)
+def get_llm(temperature: float, model_name: str = MODEL_NAME) -> ChatGroq:
+    """
+    Returns the shared ChatGroq client for a model and temperature. Every
+    client sends its requests through the pooled HTTP clients above.
+    """
+    return ChatGroq(
+        temperature=temperature,
+        model_name=model_name,
+        groq_api_key=os.getenv("GROQ_KEY"),
+        http_client=http_client(),
+        http_async_client=async_http_client(),
+    )
+
+
+async def close_clients() -> None:
+    if http_client.cache_info().currsize:
+        http_client().close()
+    if async_http_client.cache_info().currsize:
+        await async_http_client().aclose()
+    http_client.cache_clear()
+    async_http_client.cache_clear()
+    get_llm.cache_clear()
@@ -0,0 +1,33 @@
+import base64
+from typing import Optional
+
+DEFAULT_PAGE_SIZE = 10_000
+MAX_PAGE_SIZE = 100_000
+STREAM_BATCH_SIZE = 5_000
+
+
+def encode_cursor(position: int, version: str) -> str:
+    """
+    Returns an opaque cursor pointing after the given row position.
+    The dataset version is embedded so cursors expire when the data reloads.
+    """
+    raw = f"{version[:16]}:{int(position)}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], version: str) -> Optional[int]:
+    """
+    Returns the row position stored in a cursor, or None when no cursor is given.
+    Raises ValueError for malformed cursors or cursors from another dataset version.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_version, position = raw.split(":")
+        position = int(position)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Malformed cursor")
+    if cursor_version != version[:16]:
+        raise ValueError("Cursor is from an older version of the data; restart pagination")
+    return position
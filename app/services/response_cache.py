@@ -0,0 +1,123 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from serializers import VARY_HEADER
+
+EXCLUDED_HEADERS = {"content-length", "content-type"}
+
+
+class CachedResponse:
+    def __init__(self, response: Response, expires_at: float):
+        self.body = bytes(response.body)
+        self.status_code = response.status_code
+        self.media_type = response.media_type
+        self.headers = {k: v for k, v in response.headers.items() if k not in EXCLUDED_HEADERS}
+        self.expires_at = expires_at
+
+    def to_response(self, etag: str) -> Response:
+        return Response(
+            content=self.body,
+            status_code=self.status_code,
+            media_type=self.media_type,
+            headers={**self.headers, "ETag": etag},
+        )
+
+
+class ResponseCache:
+    """
+    Bounded LRU + TTL cache of serialized responses, with ETag handling.
+
+    Keys must fully describe the response: the normalized request
+    parameters plus the dataset version. The ETag is derived from the key
+    alone, so a matching If-None-Match is answered with 304 before the
+    response is even looked up or built.
+
+    Responses larger than max_entry_bytes are served but never cached, so
+    a few full-table bodies cannot take over the memory budget.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 32 * 1024 * 1024,
+        max_entry_bytes: int = 2 * 1024 * 1024,
+        ttl_seconds: float = 300,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def etag(key: Hashable) -> str:
+        return '"' + hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest() + '"'
+
+    def _evict(self, key: Hashable) -> None:
+        entry = self.entries.pop(key)
+        self.total_bytes -= len(entry.body)
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.expires_at < time.monotonic():
+                if entry is not None:
+                    self._evict(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Hashable, response: Response) -> CachedResponse:
+        entry = CachedResponse(response, time.monotonic() + self.ttl_seconds)
+        if response.status_code != 200 or len(entry.body) > self.max_entry_bytes:
+            return entry
+
+        with self.lock:
+            if key in self.entries:
+                self._evict(key)
+            self.entries[key] = entry
+            self.total_bytes += len(entry.body)
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._evict(next(iter(self.entries)))
+        return entry
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def respond(self, request: Request, key: Tuple, build: Callable[[], Response]) -> Response:
+        """
+        Returns 304 when the client already holds this representation,
+        otherwise the cached response, building and caching it on a miss.
+        """
+        etag = self.etag(key)
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")] or if_none_match.strip() == "*":
+            return Response(status_code=304, headers={"ETag": etag, "Vary": VARY_HEADER})
+
+        entry = self.get(key)
+        if entry is None:
+            entry = self.put(key, build())
+        return entry.to_response(etag)
@@ -0,0 +1,118 @@
+import math
+import logging
+from numbers import Number
+from typing import Any, Dict, List, Optional
+
+MAX_LIST_ROWS = 20
+MAX_TABLE_COLUMNS = 4
+PROMPT_SAMPLE_ROWS = 20
+PROMPT_MAX_CHARS = 4_000
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+
+def format_value(value: Any) -> str:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "—"
+    if _is_number(value):
+        if float(value).is_integer() and abs(value) < 1e15:
+            return f"{int(value):,}"
+        return f"{value:,.2f}"
+    return str(value).replace("|", "\\|")
+
+
+def column_label(column: str) -> str:
+    """
+    Turns a result column into a readable label: snake_case aliases become
+    sentence case, expressions such as SUM(grand_total) are kept as written.
+    """
+    if column.replace("_", "").isalnum():
+        return column.replace("_", " ").strip().capitalize()
+    return column
+
+
+def _rows(results: Dict[str, Any]) -> List[List[Any]]:
+    columns = results["columns"]
+    return [list(row) for row in zip(*(results["data"][column] for column in columns))]
+
+
+def _is_sorted(values: List[Any]) -> bool:
+    if len(values) < 2 or not all(_is_number(value) for value in values):
+        return False
+    return values == sorted(values) or values == sorted(values, reverse=True)
+
+
+def _truncation_note(results: Dict[str, Any]) -> str:
+    if results.get("truncated"):
+        return f"\n\n_Showing the first {results['row_count']:,} rows; the full result is larger._"
+    return ""
+
+
+def format_result(results: Dict[str, Any]) -> Optional[str]:
+    """
+    Renders common result shapes straight to markdown:
+    - a failed query or an empty result
+    - a single value
+    - a single row, as a list of fields
+    - a ranked two-column result (label, number) sorted by the number, as a numbered list
+    - a small table of up to MAX_LIST_ROWS rows and MAX_TABLE_COLUMNS columns
+
+    Returns None for anything else, which needs the LLM to interpret.
+    """
+    if results.get("error"):
+        logging.warning(f"Query failed: {results['error']}")
+        return "I couldn't run the query for that question. Try rephrasing it or naming the columns you mean."
+
+    columns = results.get("columns") or []
+    rows = _rows(results) if columns else []
+    if not rows:
+        return "No matching records were found for that question."
+
+    if len(rows) == 1 and len(columns) == 1:
+        return f"**{column_label(columns[0])}:** {format_value(rows[0][0])}"
+
+    if len(rows) == 1:
+        return "\n".join(f"- **{column_label(column)}:** {format_value(value)}" for column, value in zip(columns, rows[0]))
+
+    if len(rows) > MAX_LIST_ROWS or results.get("truncated"):
+        return None
+
+    if len(columns) == 2 and _is_sorted([row[1] for row in rows]) and not all(_is_number(row[0]) for row in rows):
+        heading = f"**{column_label(columns[1])} by {column_label(columns[0]).lower()}:**"
+        lines = [f"{position}. {format_value(label)} — {format_value(value)}" for position, (label, value) in enumerate(rows, 1)]
+        return "\n".join([heading, ""] + lines)
+
+    if len(columns) <= MAX_TABLE_COLUMNS:
+        header = "| " + " | ".join(column_label(column) for column in columns) + " |"
+        divider = "|" + "|".join(" ---: " if all(_is_number(row[i]) for row in rows) else " --- " for i in range(len(columns))) + "|"
+        body = ["| " + " | ".join(format_value(value) for value in row) + " |" for row in rows]
+        return "\n".join([header, divider] + body)
+
+    return None
+
+
+def summarize_for_prompt(results: Dict[str, Any], sample_rows: int = PROMPT_SAMPLE_ROWS, max_chars: int = PROMPT_MAX_CHARS) -> str:
+    """
+    A bounded description of a result for the LLM: the row count, summary
+    statistics of the numeric columns and the first sample_rows rows,
+    capped at max_chars characters.
+    """
+    columns = results.get("columns") or []
+    rows = _rows(results) if columns else []
+    lines = [f"{results.get('row_count', len(rows))} rows" + (" (truncated)" if results.get("truncated") else "") + f"; columns: {', '.join(columns)}"]
+
+    for i, column in enumerate(columns):
+        values = [row[i] for row in rows if _is_number(row[i])]
+        if values and len(values) == len([row for row in rows if row[i] is not None]):
+            lines.append(
+                f"{column}: min {format_value(min(values))}, max {format_value(max(values))}, "
+                f"mean {format_value(sum(values) / len(values))}, sum {format_value(sum(values))}"
+            )
+
+    lines.append(f"First {min(sample_rows, len(rows))} rows:")
+    lines.extend(" | ".join(format_value(value) for value in row) for row in rows[:sample_rows])
+
+    summary = "\n".join(lines)
+    return summary if len(summary) <= max_chars else summary[:max_chars] + "\n…"
@@ -0,0 +1,171 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from dashboard_summary import empty_summary
+from sketches import HLL_PRECISION, build_registers, merge_registers, estimate_cardinality, hll_relative_error
+
+DAY_NS = 24 * 60 * 60 * 10**9
+
+
+def build_order_sketches(
+    df: pd.DataFrame,
+    date_column: str = "created_at",
+    status_column: str = "order_status",
+    distinct_column: str = "item_id",
+    precision: int = HLL_PRECISION,
+) -> Dict[str, np.ndarray]:
+    """
+    Builds one HyperLogLog sketch of distinct_column per (day, status) pair.
+
+    Returns:
+        dict: 'day' (days since epoch) and 'status' (labels) keys sorted by day,
+        and 'registers' holding the matching sketches row by row.
+    """
+    timestamps = np.asarray(df[date_column].to_numpy(dtype="datetime64[ns]")).view("i8")
+    keep = ~df[date_column].isna().to_numpy() & df[status_column].notna().to_numpy() & df[distinct_column].notna().to_numpy()
+
+    keys = pd.DataFrame({"day": timestamps[keep] // DAY_NS, "status": df[status_column].to_numpy()[keep].astype(str)})
+    grouped = keys.groupby(["day", "status"], sort=True)
+    groups = grouped.ngroup().to_numpy()
+    pairs = grouped.size().index
+
+    registers = build_registers(df[distinct_column].to_numpy()[keep], groups, len(pairs), precision)
+    return {
+        "day": pairs.get_level_values("day").to_numpy(dtype=np.int64),
+        "status": pairs.get_level_values("status").to_numpy(dtype=str),
+        "registers": registers,
+    }
+
+
+class RollupCube:
+    """
+    Pre-aggregated day x order_status x product_category rollup of the sales frame.
+
+    Each cell holds the grand_total sum and the row count of its rows, and
+    each (day, status) pair holds a HyperLogLog sketch of its item_ids.
+    Sums and counts add across cells and sketches merge register-wise, so
+    any date-range + status-set dashboard query is answered without
+    touching the raw rows. Distinct orders are approximate, within
+    hll_relative_error() standard error.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        date_column: str = "created_at",
+        status_column: str = "order_status",
+        category_column: str = "product_category",
+        value_column: str = "grand_total",
+        distinct_column: str = "item_id",
+        sketches: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        timestamps = np.asarray(df[date_column].to_numpy(dtype="datetime64[ns]")).view("i8")
+        has_date = ~df[date_column].isna().to_numpy()
+        # Day cells can only stand in for raw timestamp comparisons when
+        # every timestamp is a whole day.
+        self.day_aligned = bool(np.all(timestamps[has_date] % DAY_NS == 0))
+
+        status_codes, self.status_labels = pd.factorize(df[status_column])
+        category_codes, self.category_labels = pd.factorize(df[category_column])
+        self.status_lookup = {status: code for code, status in enumerate(self.status_labels)}
+
+        rows = pd.DataFrame({
+            "day": timestamps // DAY_NS,
+            "status": status_codes,
+            "category": category_codes,
+            "value": pd.to_numeric(df[value_column], errors="coerce").fillna(0).to_numpy(),
+        })
+        # Rows without a date or status can never match a dashboard filter.
+        rows = rows[has_date & (status_codes >= 0)]
+
+        grouped = rows.groupby(["day", "status", "category"], sort=True)
+        cells = grouped.agg(value=("value", "sum"), rows=("value", "size")).reset_index()
+        self.cell_day = cells["day"].to_numpy()
+        self.cell_status = cells["status"].to_numpy()
+        self.cell_category = cells["category"].to_numpy()
+        self.cell_value = cells["value"].to_numpy()
+        self.cell_rows = cells["rows"].to_numpy()
+
+        if sketches is None:
+            sketches = build_order_sketches(df, date_column, status_column, distinct_column)
+        self.sketch_day = sketches["day"]
+        self.sketch_status = np.array([self.status_lookup.get(status, -1) for status in sketches["status"]])
+        self.sketch_registers = sketches["registers"]
+        self.distinct_error = hll_relative_error(int(np.log2(self.sketch_registers.shape[1])))
+
+    def __len__(self) -> int:
+        return len(self.cell_day)
+
+    def can_answer(self, start_date: pd.Timestamp, end_date: pd.Timestamp) -> bool:
+        """
+        Returns True when the date range falls on whole days, so it selects whole cells.
+        """
+        return (
+            self.day_aligned
+            and pd.Timestamp(start_date).value % DAY_NS == 0
+            and pd.Timestamp(end_date).value % DAY_NS == 0
+        )
+
+    def _select(self, day_keys: np.ndarray, status_keys: np.ndarray, start_date, end_date, statuses: List[str]) -> np.ndarray:
+        start_day = pd.Timestamp(start_date).value // DAY_NS
+        end_day = pd.Timestamp(end_date).value // DAY_NS
+        lo = np.searchsorted(day_keys, start_day, side="left")
+        hi = np.searchsorted(day_keys, end_day, side="right")
+
+        codes = [self.status_lookup[status] for status in set(statuses) if status in self.status_lookup]
+        matches = np.isin(status_keys[lo:hi], codes)
+        return lo + np.flatnonzero(matches)
+
+    def select(self, start_date: pd.Timestamp, end_date: pd.Timestamp, statuses: List[str]) -> np.ndarray:
+        """
+        Returns the positions of the cells inside the date range with one of the statuses.
+        """
+        return self._select(self.cell_day, self.cell_status, start_date, end_date, statuses)
+
+    def distinct_count(self, start_date: pd.Timestamp, end_date: pd.Timestamp, statuses: List[str]) -> int:
+        """
+        Returns the approximate number of distinct item_ids for the filter by merging the day x status sketches.
+        """
+        sketches = self._select(self.sketch_day, self.sketch_status, start_date, end_date, statuses)
+        if len(sketches) == 0:
+            return 0
+        return int(round(estimate_cardinality(merge_registers(self.sketch_registers[sketches]))))
+
+    def summarize(self, start_date: pd.Timestamp, end_date: pd.Timestamp, statuses: List[str]) -> Dict[str, Any]:
+        """
+        Returns the same payload as dashboard_summary.summarize_rows(), computed from the cells.
+        """
+        cells = self.select(start_date, end_date, statuses)
+        if len(cells) == 0:
+            return empty_summary()
+
+        values = self.cell_value[cells]
+        days = self.cell_day[cells]
+        first_day = days.min()
+        trend = np.bincount(days - first_day, weights=values)
+        trend_dates = pd.to_datetime((first_day + np.arange(len(trend))) * DAY_NS)
+
+        categories = self.cell_category[cells]
+        observed = categories >= 0
+        category_totals = pd.Series(values[observed]).groupby(categories[observed]).sum()
+        category_totals = category_totals.sort_values(ascending=False, kind="stable")
+
+        total_sales = float(values.sum())
+        total_rows = int(self.cell_rows[cells].sum())
+
+        return {
+            "trend": {
+                "created_at": trend_dates.strftime("%Y-%m-%d").tolist(),
+                "grand_total": trend.tolist(),
+            },
+            "categories": {
+                "product_category": [str(self.category_labels[c]) for c in category_totals.index],
+                "grand_total": category_totals.tolist(),
+            },
+            "total_sales": total_sales,
+            "total_orders": self.distinct_count(start_date, end_date, statuses),
+            "total_orders_error": self.distinct_error,
+            "avg_order_value": total_sales / total_rows,
+        }
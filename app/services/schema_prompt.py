@@ -0,0 +1,133 @@
+import re
+import difflib
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from intent_classifier import TIME_WORDS, YEAR
+
+TOKEN_BUDGET = 400
+CHARS_PER_TOKEN = 4
+MIN_COLUMNS = 4
+EXAMPLE_VALUES = 5
+FUZZY_CUTOFF = 0.8
+
+WORD = re.compile(r"[a-z0-9]+")
+DATE_VALUE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+SYNONYMS = {"sales": {"total"}, "revenue": {"total"}, "spend": {"total"}, "amount": {"total"}, "paid": {"payment"}}
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _number(value: Any) -> str:
+    if value is None:
+        return "?"
+    return f"{int(value)}" if float(value).is_integer() else f"{value:.2f}"
+
+
+def _is_date(entry: Dict[str, Any]) -> bool:
+    values = entry.get("values") or []
+    return bool(values) and all(isinstance(value, str) and DATE_VALUE.match(value) for value in values)
+
+
+def describe_column(column: str, entry: Dict[str, Any], values: List[Any]) -> str:
+    """
+    One-line description of a column, e.g.
+    "order_status: text, 3 values: canceled, completed, refund" or
+    "price: number 1-96499".
+    """
+    if entry.get("type") == "numerical":
+        stats = entry.get("stats") or {}
+        return f"{column}: number {_number(stats.get('min'))}-{_number(stats.get('max'))}"
+
+    if _is_date(entry):
+        return f"{column}: date (YYYY-MM-DD text)"
+
+    distinct = entry.get("distinct_count")
+    shown = ", ".join(str(value) for value in values)
+    if distinct is not None and distinct > len(values):
+        return f"{column}: text, {distinct} values, e.g. {shown}" if shown else f"{column}: text, {distinct} values"
+    return f"{column}: text, values: {shown}" if shown else f"{column}: text"
+
+
+class SchemaPrompt:
+    """
+    Compact, per-question schema text for SQL generation.
+
+    Columns are ranked by how well the question matches their name words
+    (exactly, singularized, through a few synonyms or by fuzzy match) and
+    their known values, with date columns boosted for time-bound questions;
+    literals resolved by ValueIndex count as matched values even when the
+    schema does not list them. Matched values are listed first. The best
+    matches (at least MIN_COLUMNS columns, padded in schema order) are
+    described one per line while they fit the token budget, and the
+    remaining columns are listed by name only so the model still knows
+    they exist.
+    """
+
+    def __init__(self, schema: Dict[str, Dict[str, Any]], token_budget: int = TOKEN_BUDGET):
+        self.schema = schema
+        self.token_budget = token_budget
+        self.name_words: Dict[str, Set[str]] = {
+            column: set(WORD.findall(column.lower().replace("_", " "))) for column in schema
+        }
+        self.value_words: Dict[str, List[Tuple[Any, Set[str]]]] = {
+            column: [(value, set(WORD.findall(str(value).lower()))) for value in (entry.get("values") or [])]
+            for column, entry in schema.items()
+            if entry.get("type") != "numerical"
+        }
+        self.vocabulary = sorted(set().union(*self.name_words.values())) if schema else []
+
+    def _question_words(self, question: str) -> Set[str]:
+        words = set(WORD.findall(question.lower()))
+        for word in list(words):
+            words.update(SYNONYMS.get(word, ()))
+            if len(word) > 3 and word.endswith("s"):
+                words.add(word[:-1])
+            if len(word) > 3 and word not in self.vocabulary:
+                words.update(difflib.get_close_matches(word, self.vocabulary, n=2, cutoff=FUZZY_CUTOFF))
+        return words
+
+    def rank(self, question: str, literals: Optional[List[Dict[str, Any]]] = None) -> List[Tuple[str, float, List[Any]]]:
+        """
+        Returns (column, score, matched_values) for every column, best first.
+        """
+        words = self._question_words(question)
+        resolved: Dict[str, List[Any]] = {}
+        for literal in literals or []:
+            resolved.setdefault(literal["column"], []).append(literal["value"])
+        time_bound = bool(words & TIME_WORDS) or any(YEAR.match(word) for word in words)
+        ranked = []
+        for position, column in enumerate(self.schema):
+            score = 3.0 * len(self.name_words[column] & words)
+            matched_values = [value for value, value_words in self.value_words.get(column, []) if value_words and value_words <= words]
+            matched_values = list(dict.fromkeys(resolved.get(column, []) + matched_values))
+            score += 2.0 * len(matched_values)
+            if time_bound and _is_date(self.schema[column]):
+                score += 2.0
+            ranked.append((column, score, matched_values, position))
+        ranked.sort(key=lambda item: (-item[1], item[3]))
+        return [(column, score, matched_values) for column, score, matched_values, _ in ranked]
+
+    def render(self, question: str, literals: Optional[List[Dict[str, Any]]] = None) -> str:
+        lines: Dict[str, str] = {}
+        used = 0
+        for index, (column, score, matched_values) in enumerate(self.rank(question, literals)):
+            if score <= 0 and index >= MIN_COLUMNS:
+                break
+            entry = self.schema[column]
+            values = list(dict.fromkeys(matched_values + list(entry.get("values") or [])))[:EXAMPLE_VALUES]
+            line = describe_column(column, entry, values)
+            cost = estimate_tokens(line)
+            if used + cost > self.token_budget:
+                break
+            lines[column] = line
+            used += cost
+
+        described = [lines[column] for column in self.schema if column in lines]
+        others = [column for column in self.schema if column not in lines]
+        if others:
+            other_line = f"other columns: {', '.join(others)}"
+            if used + estimate_tokens(other_line) <= self.token_budget:
+                described.append(other_line)
+        return "\n".join(described)
@@ -0,0 +1,191 @@
+import gzip
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+RECORDS_MEDIA_TYPE = "application/json"
+COLUMNS_MEDIA_TYPE = "application/vnd.datalinko.columns+json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+FORMAT_MEDIA_TYPES = {
+    "records": RECORDS_MEDIA_TYPE,
+    "columns": COLUMNS_MEDIA_TYPE,
+    "arrow": ARROW_MEDIA_TYPE,
+    "ndjson": NDJSON_MEDIA_TYPE,
+}
+
+MIN_COMPRESS_BYTES = 1024
+VARY_HEADER = "Accept, Accept-Encoding"
+# One text form for datetimes in every JSON format, matching how
+# sqlite_loader stores them, so switching formats never changes a value.
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def negotiate_format(accept: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Picks the response format from an explicit ?format= value or the Accept header.
+    Media types are tried in the order the client lists them; anything
+    unrecognised falls back to JSON records.
+    """
+    if requested:
+        if requested not in FORMAT_MEDIA_TYPES:
+            raise HTTPException(status_code=400, detail=f"Unknown format '{requested}'. Use one of: {', '.join(FORMAT_MEDIA_TYPES)}")
+        if requested == "arrow" and pa is None:
+            raise HTTPException(status_code=406, detail="Arrow output requires pyarrow on the server")
+        return requested
+
+    media_formats = {media_type: fmt for fmt, media_type in FORMAT_MEDIA_TYPES.items()}
+    for entry in (accept or "").split(","):
+        media_type = entry.split(";")[0].strip().lower()
+        fmt = media_formats.get(media_type)
+        if fmt == "arrow" and pa is None:
+            continue
+        if fmt:
+            return fmt
+    return "records"
+
+
+def _datetime_text(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the frame with datetime columns rendered as DATETIME_FORMAT text (None for NaT).
+    """
+    converted = {}
+    for column in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[column].dtype):
+            text = df[column].dt.strftime(DATETIME_FORMAT)
+            converted[column] = text.astype(object).where(text.notna(), None)
+    return df.assign(**converted) if converted else df
+
+
+def _column_values(series: pd.Series) -> Any:
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        text = series.dt.strftime(DATETIME_FORMAT)
+        return text.astype(object).where(text.notna(), None).tolist()
+    if pd.api.types.is_numeric_dtype(series.dtype) and isinstance(series.dtype, np.dtype):
+        # Passed straight through to orjson; NaN is written as null.
+        return np.ascontiguousarray(series.to_numpy())
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def encode_ndjson(df: pd.DataFrame) -> bytes:
+    """
+    Serializes a frame as newline-delimited JSON records with NaN as null.
+    """
+    if df.empty:
+        return b""
+    return _datetime_text(df).to_json(orient="records", lines=True).rstrip("\n").encode() + b"\n"
+
+
+def iter_ndjson(frames: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """
+    Yields one NDJSON chunk per frame, so rows go out as soon as each batch is serialized.
+    """
+    for frame in frames:
+        yield encode_ndjson(frame)
+
+
+def encode_frame(df: pd.DataFrame, fmt: str, message: str, extra: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Serializes a frame in one of the FORMAT_MEDIA_TYPES formats:
+    - records: {"message", "data": [{column: value}, ...]} with NaN as ""
+    - columns: {"message", "columns", "data": {column: [values]}} with NaN as null
+    - arrow: an Arrow IPC stream of the frame (message and extra are not included)
+    - ndjson: one JSON record per line with NaN as null (message and extra are not included)
+    The JSON formats write datetimes as DATETIME_FORMAT text; Arrow keeps them as timestamps.
+    JSON payloads also carry the keys of extra, e.g. the pagination cursor.
+    """
+    extra = extra or {}
+    if fmt == "ndjson":
+        return encode_ndjson(df)
+
+    if fmt == "arrow":
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    if fmt == "columns":
+        payload = {
+            "message": message,
+            "columns": df.columns.tolist(),
+            "data": {column: _column_values(df[column]) for column in df.columns},
+            **extra,
+        }
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    records = _datetime_text(df)
+    # Categorical columns reject "" as a new value, so fill on object dtype.
+    data = records.astype(object).where(records.notna(), "").to_dict(orient="records")
+    return orjson.dumps({"message": message, "data": data, **extra})
+
+
+def preferred_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Returns the content encoding to use for a client: zstd, gzip or None.
+    """
+    if not accept_encoding:
+        return None
+    encodings = {entry.split(";")[0].strip().lower() for entry in accept_encoding.split(",")}
+    if "zstd" in encodings and zstandard is not None:
+        return "zstd"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """
+    Compresses a body with zstd or gzip when the client accepts it and the
+    body is large enough to benefit. Returns (body, content_encoding).
+    """
+    encoding = preferred_encoding(accept_encoding)
+    if encoding is None or len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body), "zstd"
+    return gzip.compress(body, compresslevel=5), "gzip"
+
+
+def encoded_response(
+    body: bytes,
+    media_type: str,
+    accept_encoding: Optional[str],
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    body, encoding = compress(body, accept_encoding)
+    headers = {"Vary": VARY_HEADER, **(headers or {})}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, status_code=status_code, headers=headers)
+
+
+def frame_response(
+    df: pd.DataFrame,
+    fmt: str,
+    message: str,
+    accept_encoding: Optional[str],
+    extra: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    return encoded_response(encode_frame(df, fmt, message, extra), FORMAT_MEDIA_TYPES[fmt], accept_encoding, headers=headers)
+
+
+def json_response(content: Dict[str, Any], accept_encoding: Optional[str], status_code: int = 200) -> Response:
+    return encoded_response(orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY), RECORDS_MEDIA_TYPE, accept_encoding, status_code)
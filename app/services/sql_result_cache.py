@@ -0,0 +1,99 @@
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+SQL_PART = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|\[[^\]]*\])|(\s+)|([^'\"`\[\s]+|.)")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Canonical form of a statement for cache keys: whitespace collapsed,
+    trailing semicolons dropped and everything outside string literals and
+    quoted identifiers lowercased (SQLite keywords and names are case-insensitive).
+    """
+    parts = []
+    for quoted, space, other in SQL_PART.findall(sql.strip().rstrip(";").strip()):
+        if quoted:
+            parts.append(quoted)
+        elif space:
+            parts.append(" ")
+        else:
+            parts.append(other.lower())
+    return "".join(parts)
+
+
+def result_bytes(result: Dict[str, Any]) -> int:
+    """
+    Approximate memory held by a column-oriented result: the value lists
+    and every value in them.
+    """
+    total = sys.getsizeof(result)
+    for values in result.get("data", {}).values():
+        total += sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+    return total
+
+
+class SQLResultCache:
+    """
+    Bounded LRU cache of query results shared by every request in the
+    process. Keys are the normalized SQL plus the version of the data it
+    ran against, so reloading the table makes earlier entries unreachable
+    (they age out of the LRU). Eviction is by entry count and by the
+    approximate memory of the cached rows.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 128 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(sql: str, version: Optional[str]) -> Tuple[Optional[str], str]:
+        return (version, normalize_sql(sql))
+
+    def get(self, sql: str, version: Optional[str]) -> Optional[Dict[str, Any]]:
+        key = self.key(sql, version)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, sql: str, version: Optional[str], result: Dict[str, Any]) -> None:
+        if "error" in result:
+            return
+        size = result_bytes(result)
+        if size > self.max_bytes:
+            return
+
+        key = self.key(sql, version)
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (result, size)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self.total_bytes -= self.entries.popitem(last=False)[1][1]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
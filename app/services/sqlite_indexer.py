@@ -0,0 +1,160 @@
+import sqlite3
+import logging
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+from sqlite_loader import configure_connection, quote_identifier
+
+LOW_CARDINALITY_MAX = 200
+MAX_COMPOSITE_INDEXES = 4
+ID_COLUMN_HINTS = ("customer",)
+
+
+def index_name(table_name: str, columns: Tuple[str, ...], prefix: str = "idx") -> str:
+    return f"{prefix}_{table_name}_{'__'.join(columns)}"
+
+
+def uses_index(conn: sqlite3.Connection, sql: str) -> bool:
+    """
+    Returns True when EXPLAIN QUERY PLAN shows the statement reading the table through an index.
+    """
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    details = [row[-1].upper() for row in plan]
+    return any("USING INDEX" in d or "USING COVERING INDEX" in d for d in details) and not any(
+        d.startswith("SCAN") and "USING" not in d for d in details
+    )
+
+
+def _table_columns(conn: sqlite3.Connection, table_name: str) -> Dict[str, str]:
+    return {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA table_info({quote_identifier(table_name)})")}
+
+
+def _is_date_column(entry: Dict[str, Any], sql_type: str) -> bool:
+    if sql_type == "TIMESTAMP":
+        return True
+    values = [value for value in entry.get("values", []) if value not in (None, "")]
+    if not values or not all(isinstance(value, str) and value[:1].isdigit() for value in values):
+        return False
+    parsed = pd.to_datetime(pd.Series(values), errors="coerce", format="ISO8601")
+    return bool(parsed.notna().all())
+
+
+def _distinct_count(conn: sqlite3.Connection, table_name: str, column: str, entry: Dict[str, Any]) -> int:
+    if "distinct_count" in entry:
+        return int(entry["distinct_count"])
+    stats = entry.get("stats") or {}
+    for key in ("distinct_count", "unique_count"):
+        if key in stats:
+            return int(stats[key])
+    if len(entry.get("values", [])) < 10:
+        return len(entry.get("values", []))
+    return conn.execute(
+        f"SELECT COUNT(DISTINCT {quote_identifier(column)}) FROM {quote_identifier(table_name)}"
+    ).fetchone()[0]
+
+
+def plan_indexes(conn: sqlite3.Connection, table_name: str, schema: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Chooses indexes for the columns LLM-generated SQL filters and groups on,
+    using the SchemaInferenceAgent output:
+    - date columns and low-cardinality categoricals get single-column indexes
+    - customer identifier columns get single-column indexes
+    - each low-cardinality categorical is paired with the first date column
+
+    Returns:
+        dict: {'single': [...], 'composite': [(categorical, date), ...], 'dates': [...], 'categoricals': [...]}
+    """
+    table_columns = _table_columns(conn, table_name)
+    dates, categoricals, identifiers = [], [], []
+
+    for column, entry in schema.items():
+        sql_type = table_columns.get(column)
+        if sql_type is None:
+            continue
+        if _is_date_column(entry, sql_type):
+            dates.append(column)
+        elif any(hint in column for hint in ID_COLUMN_HINTS):
+            identifiers.append(column)
+        elif entry.get("type") == "categorical" and sql_type == "TEXT":
+            if _distinct_count(conn, table_name, column, entry) <= LOW_CARDINALITY_MAX:
+                categoricals.append(column)
+
+    composite = [(column, dates[0]) for column in categoricals[:MAX_COMPOSITE_INDEXES]] if dates else []
+    return {
+        "single": dates + categoricals + identifiers,
+        "composite": composite,
+        "dates": dates,
+        "categoricals": categoricals,
+    }
+
+
+def _probe_queries(table_name: str, columns: List[str], plan: Dict[str, Any]) -> List[str]:
+    """
+    Representative filter and GROUP BY statements, one pair per schema
+    column plus one per composite index, used to measure plan coverage.
+    """
+    table = quote_identifier(table_name)
+    queries = []
+    for column in columns:
+        queries.append(f"SELECT COUNT(*) FROM {table} WHERE {quote_identifier(column)} = ''")
+        queries.append(f"SELECT {quote_identifier(column)}, COUNT(*) FROM {table} GROUP BY {quote_identifier(column)}")
+    for categorical, date in plan["composite"]:
+        queries.append(
+            f"SELECT COUNT(*) FROM {table} WHERE {quote_identifier(categorical)} = '' "
+            f"AND {quote_identifier(date)} BETWEEN '2000-01-01' AND '2100-01-01'"
+        )
+    return queries
+
+
+def ensure_indexes(db_path: str, table_name: str, schema: Dict[str, Dict[str, Any]], analyze: bool = False) -> Dict[str, Any]:
+    """
+    Creates the planned indexes on table_name, refreshes planner statistics
+    with ANALYZE when the table or its indexes changed, and reports how many
+    representative queries the planner can now answer through an index.
+
+    Args:
+        analyze (bool): Force ANALYZE, e.g. after the table was reloaded.
+
+    Returns:
+        dict: {'created': [...], 'indexes': [...], 'coverage': float, 'unindexed': [...]}
+    """
+    conn = configure_connection(sqlite3.connect(db_path))
+    try:
+        plan = plan_indexes(conn, table_name, schema)
+        existing = {
+            row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?", (table_name,)
+            )
+        }
+
+        created = []
+        for columns in [(column,) for column in plan["single"]] + plan["composite"]:
+            name = index_name(table_name, columns)
+            if name in existing:
+                continue
+            column_list = ", ".join(quote_identifier(column) for column in columns)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {quote_identifier(name)} ON {quote_identifier(table_name)} ({column_list})")
+            created.append(name)
+
+        if created or analyze:
+            conn.execute("ANALYZE")
+        conn.commit()
+
+        columns = [column for column in schema if column in _table_columns(conn, table_name)]
+        queries = _probe_queries(table_name, columns, plan)
+        unindexed = [sql for sql in queries if not uses_index(conn, sql)]
+        report = {
+            "created": created,
+            "indexes": sorted(existing | set(created)),
+            "coverage": 1 - len(unindexed) / len(queries) if queries else 1.0,
+            "unindexed": unindexed,
+        }
+    finally:
+        conn.close()
+
+    logging.info(
+        f"{table_name}: {len(created)} indexes created, "
+        f"{report['coverage']:.0%} of schema probe queries use an index"
+    )
+    return report
@@ -0,0 +1,200 @@
+import json
+import sqlite3
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from dataset_cache import dataset_fingerprint, prefix_sha256, source_dtypes
+
+INSERT_BATCH_SIZE = 50_000
+BUSY_TIMEOUT_MS = 120_000
+SYNC_STATE_TABLE = "_sync_state"
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64_000,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def configure_connection(conn: sqlite3.Connection, pragmas: Optional[Dict[str, Any]] = None) -> sqlite3.Connection:
+    """
+    Applies the tuned PRAGMAs (WAL journal, relaxed fsync, larger page
+    cache and memory-mapped I/O) to a connection.
+    """
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    for name, value in (pragmas or SQLITE_PRAGMAS).items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def sqlite_type(dtype: Any) -> str:
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "TIMESTAMP"
+    return "TEXT"
+
+
+def column_types(df: pd.DataFrame, original_dtypes: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+    """
+    Returns (column, SQLite type) pairs. original_dtypes, given per position,
+    keeps REAL affinity for columns that were floats in the source even if
+    optimize_dtypes() stored them as integers, so division and averages in
+    generated SQL are not truncated to integers.
+    """
+    if original_dtypes is None or len(original_dtypes) != len(df.columns):
+        original_dtypes = [""] * len(df.columns)
+    types = []
+    for column, original in zip(df.columns, original_dtypes):
+        sql_type = sqlite_type(df[column].dtype)
+        if sql_type == "INTEGER" and original.startswith("float"):
+            sql_type = "REAL"
+        types.append((str(column), sql_type))
+    return types
+
+
+def _column_values(series: pd.Series) -> List[Any]:
+    """
+    Converts a column slice to Python values sqlite3 can bind, with None for missing values.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        series = series.dt.strftime("%Y-%m-%d %H:%M:%S")
+    elif isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+        series = series.astype(object)
+    values = series.tolist()
+    if series.hasnans:
+        values = [None if pd.isna(value) else value for value in values]
+    return values
+
+
+def _iter_batches(df: pd.DataFrame, start: int = 0) -> Iterator[List[Tuple[Any, ...]]]:
+    for offset in range(start, len(df), INSERT_BATCH_SIZE):
+        chunk = df.iloc[offset:offset + INSERT_BATCH_SIZE]
+        yield list(zip(*(_column_values(chunk[column]) for column in chunk.columns)))
+
+
+def _insert_rows(conn: sqlite3.Connection, table_name: str, df: pd.DataFrame, start: int = 0) -> int:
+    placeholders = ", ".join("?" for _ in df.columns)
+    statement = f"INSERT INTO {quote_identifier(table_name)} VALUES ({placeholders})"
+    inserted = 0
+    for batch in _iter_batches(df, start):
+        conn.executemany(statement, batch)
+        inserted += len(batch)
+    return inserted
+
+
+def _read_state(conn: sqlite3.Connection, table_name: str) -> Optional[Dict[str, Any]]:
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS {SYNC_STATE_TABLE} ("
+        "table_name TEXT PRIMARY KEY, source_sha256 TEXT, source_size INTEGER, row_count INTEGER, columns TEXT)"
+    )
+    row = conn.execute(
+        f"SELECT source_sha256, source_size, row_count, columns FROM {SYNC_STATE_TABLE} WHERE table_name = ?",
+        (table_name,)
+    ).fetchone()
+    if row is None:
+        return None
+    return {"sha256": row[0], "size": row[1], "row_count": row[2], "columns": json.loads(row[3])}
+
+
+def table_version(conn: sqlite3.Connection, table_name: str) -> Optional[str]:
+    """
+    Returns an identifier of the data last synced into table_name (the
+    source hash and row count), which changes whenever sync_table writes.
+    """
+    try:
+        row = conn.execute(
+            f"SELECT source_sha256, row_count FROM {SYNC_STATE_TABLE} WHERE table_name = ?", (table_name,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return f"{row[0]}:{row[1]}" if row else None
+
+
+def _write_state(conn: sqlite3.Connection, table_name: str, fingerprint: Dict[str, Any], row_count: int, columns: List[Tuple[str, str]]) -> None:
+    conn.execute(
+        f"INSERT OR REPLACE INTO {SYNC_STATE_TABLE} (table_name, source_sha256, source_size, row_count, columns) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (table_name, fingerprint["sha256"], fingerprint["size"], row_count, json.dumps(columns))
+    )
+
+
+def _rebuild(conn: sqlite3.Connection, table_name: str, df: pd.DataFrame, columns: List[Tuple[str, str]]) -> int:
+    definition = ", ".join(f"{quote_identifier(name)} {sql_type}" for name, sql_type in columns)
+    conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(table_name)}")
+    conn.execute(f"CREATE TABLE {quote_identifier(table_name)} ({definition})")
+    return _insert_rows(conn, table_name, df)
+
+
+def sync_table(db_path: str, table_name: str, df: pd.DataFrame, source_path: str) -> str:
+    """
+    Brings a SQLite table in line with the frame loaded from source_path.
+
+    - If the source fingerprint and column types match the last sync, nothing is written.
+    - If the source only grew by appending (its old bytes hash the same)
+      and the columns are unchanged, only the new trailing rows are inserted.
+    - Otherwise the table is recreated with explicit column types.
+
+    All writes happen in one IMMEDIATE transaction with batched
+    executemany, so concurrent workers serialize on the write lock and
+    the ones that follow find the table already in sync.
+
+    Returns:
+        str: 'unchanged', 'appended' or 'rebuilt'.
+    """
+    fingerprint = dataset_fingerprint(source_path)
+    columns = column_types(df, source_dtypes(source_path))
+
+    conn = configure_connection(sqlite3.connect(db_path, isolation_level=None))
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            state = _read_state(conn, table_name)
+            table_exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+            ).fetchone() is not None
+
+            if (
+                table_exists
+                and state is not None
+                and state["sha256"] == fingerprint["sha256"]
+                and state["row_count"] == len(df)
+                and [tuple(column) for column in state["columns"]] == columns
+            ):
+                result = "unchanged"
+            elif (
+                table_exists
+                and state is not None
+                and [tuple(column) for column in state["columns"]] == columns
+                and fingerprint["size"] > state["size"]
+                and len(df) >= state["row_count"]
+                and prefix_sha256(source_path, state["size"]) == state["sha256"]
+            ):
+                inserted = _insert_rows(conn, table_name, df, start=state["row_count"])
+                _write_state(conn, table_name, fingerprint, len(df), columns)
+                result = "appended"
+                logging.info(f"Appended {inserted} rows to {table_name}")
+            else:
+                inserted = _rebuild(conn, table_name, df, columns)
+                _write_state(conn, table_name, fingerprint, len(df), columns)
+                result = "rebuilt"
+                logging.info(f"Rebuilt {table_name} with {inserted} rows")
+
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+    return result
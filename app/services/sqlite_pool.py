@@ -0,0 +1,140 @@
+import os
+import time
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import quote
+
+from sqlite_loader import SQLITE_PRAGMAS, configure_connection
+
+READ_PRAGMAS = {
+    **{name: value for name, value in SQLITE_PRAGMAS.items() if name not in ("journal_mode", "synchronous")},
+    "query_only": "ON",
+}
+
+QUERY_TIMEOUT_SECONDS = 5.0
+MAX_RESULT_ROWS = 1_000
+FETCH_BATCH_SIZE = 256
+PROGRESS_INTERVAL = 10_000
+
+
+class QueryTimeout(Exception):
+    pass
+
+
+class ReadOnlyPool:
+    """
+    A bounded pool of read-only SQLite connections.
+
+    Connections are opened lazily with a mode=ro URI, configured once with
+    READ_PRAGMAS and handed out one caller at a time; when all `size`
+    connections are busy, callers wait up to `wait_seconds` for one.
+    """
+
+    def __init__(self, db_path: str, size: int = 4, wait_seconds: float = 30):
+        self.uri = f"file:{quote(os.path.abspath(db_path))}?mode=ro"
+        self.size = size
+        self.wait_seconds = wait_seconds
+        self.idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+        return configure_connection(conn, READ_PRAGMAS)
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if self.opened < self.size:
+                self.opened += 1
+                open_new = True
+            else:
+                open_new = False
+        if open_new:
+            try:
+                return self._connect()
+            except Exception:
+                with self.lock:
+                    self.opened -= 1
+                raise
+        return self.idle.get(timeout=self.wait_seconds)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._acquire()
+        try:
+            yield conn
+        except sqlite3.Error:
+            # The connection may be in a bad state; replace it on next use.
+            conn.close()
+            with self.lock:
+                self.opened -= 1
+            conn = None
+            raise
+        finally:
+            if conn is not None:
+                self.idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self.lock:
+                self.opened -= 1
+
+
+def run_query(
+    conn: sqlite3.Connection,
+    sql: str,
+    timeout_seconds: Optional[float] = QUERY_TIMEOUT_SECONDS,
+    max_rows: int = MAX_RESULT_ROWS,
+) -> Dict[str, Any]:
+    """
+    Runs one statement with guardrails and returns a column-oriented result.
+
+    - The statement is interrupted once it runs longer than timeout_seconds
+      (checked every PROGRESS_INTERVAL VM instructions), raising QueryTimeout.
+    - At most max_rows rows are fetched, in FETCH_BATCH_SIZE batches, so a
+      huge result is never materialized.
+
+    Returns:
+        dict: {'columns': [...], 'data': {column: [values]}, 'row_count': int, 'truncated': bool}
+    """
+    deadline = time.monotonic() + timeout_seconds if timeout_seconds else None
+    if deadline is not None:
+        conn.set_progress_handler(lambda: int(time.monotonic() > deadline), PROGRESS_INTERVAL)
+
+    try:
+        cursor = conn.execute(sql)
+        columns = [column[0] for column in cursor.description or []]
+        rows = []
+        while len(rows) <= max_rows:
+            batch = cursor.fetchmany(min(FETCH_BATCH_SIZE, max_rows + 1 - len(rows)))
+            if not batch:
+                break
+            rows.extend(batch)
+        cursor.close()
+    except sqlite3.OperationalError as e:
+        if deadline is not None and time.monotonic() > deadline and "interrupt" in str(e).lower():
+            raise QueryTimeout(f"Query exceeded the {timeout_seconds:g}s time budget") from e
+        raise
+    finally:
+        if deadline is not None:
+            conn.set_progress_handler(None, 0)
+
+    truncated = len(rows) > max_rows
+    rows = rows[:max_rows]
+    return {
+        "columns": columns,
+        "data": {column: [row[i] for row in rows] for i, column in enumerate(columns)},
+        "row_count": len(rows),
+        "truncated": truncated,
+    }
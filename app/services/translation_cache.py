@@ -0,0 +1,226 @@
+import re
+import json
+import time
+import difflib
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlite_loader import configure_connection
+
+TRANSLATION_TABLE = "nl_sql_translations"
+MAX_ENTRIES = 5_000
+SIMILARITY_THRESHOLD = 0.9
+SPELLING_CUTOFF = 0.85
+MIN_CORRECTABLE_LENGTH = 4
+TOUCH_FLUSH_EVERY = 64
+
+TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+FILLER_WORDS = {"a", "an", "the", "please", "me", "show", "give", "tell", "can", "you", "what", "is", "are", "of"}
+DOMAIN_WORDS = {
+    "total", "sales", "revenue", "orders", "order", "average", "count", "number", "sum", "top", "bottom",
+    "highest", "lowest", "most", "least", "last", "this", "previous", "year", "quarter", "month", "week",
+    "day", "daily", "weekly", "monthly", "yearly", "category", "categories", "status", "customer",
+    "customers", "product", "products", "payment", "method", "discount", "price", "quantity", "between",
+    "compare", "trend", "per", "each", "by",
+}
+
+
+def schema_version(schema: Dict[str, Any], table_name: str) -> str:
+    """
+    Identifies a schema for cache keys: translations made against one
+    schema are never served for another.
+    """
+    payload = json.dumps({"table": table_name, "schema": schema}, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode(), digest_size=12).hexdigest()
+
+
+def schema_vocabulary(schema: Dict[str, Any]) -> Set[str]:
+    """
+    Words spelling correction snaps question tokens to: the column name
+    parts and the words in the example values, plus DOMAIN_WORDS.
+    """
+    words = set(DOMAIN_WORDS)
+    for column, entry in schema.items():
+        words.update(TOKEN.findall(str(column).lower().replace("_", " ")))
+        for value in entry.get("values", []) if isinstance(entry, dict) else []:
+            words.update(TOKEN.findall(str(value).lower()))
+    return {word for word in words if not word.isdigit()}
+
+
+class TranslationCache:
+    """
+    Persistent cache of natural-language question -> generated SQL.
+
+    Questions are keyed on their normalized form (lowercase, no
+    punctuation or filler words, misspelled words snapped to the schema
+    vocabulary) together with the schema version. Entries live in a SQLite
+    table and are mirrored in memory for the current schema version; the
+    least recently used are evicted beyond max_entries. When similarity
+    lookup is enabled, a miss falls back to the closest cached question
+    whose normalized tokens are at least `similarity` alike and which
+    mentions exactly the same numbers.
+
+    Hits only update memory; their hit counts and last-used times are
+    written in batches (with the next put, once TOUCH_FLUSH_EVERY questions
+    have pending hits, or on flush()). All methods may block on SQLite, so
+    async callers run them in a worker thread; a lock serializes access to
+    the shared connection.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        version: str,
+        vocabulary: Iterable[str] = (),
+        max_entries: int = MAX_ENTRIES,
+        similarity: Optional[float] = SIMILARITY_THRESHOLD,
+    ):
+        self.version = version
+        self.vocabulary = sorted(set(vocabulary) | DOMAIN_WORDS)
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.conn = configure_connection(sqlite3.connect(db_path, check_same_thread=False))
+        self.conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {TRANSLATION_TABLE} ("
+            "schema_version TEXT, question_key TEXT, question TEXT, sql TEXT, hits INTEGER, last_used REAL, "
+            "PRIMARY KEY (schema_version, question_key))"
+        )
+        self.conn.execute(f"DELETE FROM {TRANSLATION_TABLE} WHERE schema_version != ?", (version,))
+        self.conn.commit()
+
+        rows = self.conn.execute(
+            f"SELECT question_key, sql FROM {TRANSLATION_TABLE} WHERE schema_version = ? ORDER BY last_used",
+            (version,)
+        ).fetchall()
+        self.entries: "OrderedDict[str, str]" = OrderedDict(rows)
+        self.corrections: Dict[str, str] = {}
+        self.pending_touches: Dict[str, List[float]] = {}
+
+    def _correct(self, token: str) -> str:
+        if len(token) < MIN_CORRECTABLE_LENGTH or token.isdigit() or token in DOMAIN_WORDS:
+            return token
+        if token not in self.corrections:
+            matches = difflib.get_close_matches(token, self.vocabulary, n=1, cutoff=SPELLING_CUTOFF)
+            self.corrections[token] = matches[0] if matches else token
+        return self.corrections[token]
+
+    def normalize(self, question: str) -> str:
+        tokens = TOKEN.findall(question.lower())
+        return " ".join(self._correct(token) for token in tokens if token not in FILLER_WORDS)
+
+    def _touch(self, key: str) -> None:
+        self.entries.move_to_end(key)
+        touch = self.pending_touches.setdefault(key, [0, 0.0])
+        touch[0] += 1
+        touch[1] = time.time()
+        if len(self.pending_touches) >= TOUCH_FLUSH_EVERY:
+            self._write_touches()
+            self.conn.commit()
+
+    def _write_touches(self) -> None:
+        if self.pending_touches:
+            self.conn.executemany(
+                f"UPDATE {TRANSLATION_TABLE} SET hits = hits + ?, last_used = ? WHERE schema_version = ? AND question_key = ?",
+                [(hits, last_used, self.version, key) for key, (hits, last_used) in self.pending_touches.items()]
+            )
+            self.pending_touches.clear()
+
+    def flush(self) -> None:
+        """
+        Writes the pending hit counts and last-used times.
+        """
+        with self.lock:
+            self._write_touches()
+            self.conn.commit()
+
+    def _closest(self, key: str) -> Optional[str]:
+        tokens = set(key.split())
+        numbers = {token for token in tokens if token[0].isdigit()}
+        best_key, best_score = None, 0.0
+        for candidate in self.entries:
+            candidate_tokens = set(candidate.split())
+            if {token for token in candidate_tokens if token[0].isdigit()} != numbers:
+                continue
+            score = len(tokens & candidate_tokens) / len(tokens | candidate_tokens)
+            if score > best_score:
+                best_key, best_score = candidate, score
+        return best_key if best_score >= self.similarity else None
+
+    def get(self, question: str) -> Optional[str]:
+        key = self.normalize(question)
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self._touch(key)
+                return self.entries[key]
+
+            similar = self._closest(key) if self.similarity and key else None
+            if similar is not None:
+                self.similar_hits += 1
+                self._touch(similar)
+                return self.entries[similar]
+
+            self.misses += 1
+            return None
+
+    def put(self, question: str, sql: str) -> None:
+        key = self.normalize(question)
+        if not key:
+            return
+        with self.lock:
+            self.entries[key] = sql
+            self.entries.move_to_end(key)
+            self.pending_touches.pop(key, None)
+            self._write_touches()
+            self.conn.execute(
+                f"INSERT OR REPLACE INTO {TRANSLATION_TABLE} (schema_version, question_key, question, sql, hits, last_used) "
+                "VALUES (?, ?, ?, ?, 0, ?)",
+                (self.version, key, question, sql, time.time())
+            )
+            evicted: List[str] = []
+            while len(self.entries) > self.max_entries:
+                evicted.append(self.entries.popitem(last=False)[0])
+            if evicted:
+                self.conn.executemany(
+                    f"DELETE FROM {TRANSLATION_TABLE} WHERE schema_version = ? AND question_key = ?",
+                    [(self.version, evicted_key) for evicted_key in evicted]
+                )
+            self.conn.commit()
+
+    def discard(self, question: str, sql: Optional[str] = None) -> None:
+        """
+        Drops a translation, e.g. because the SQL it produced failed to run.
+        Passing the SQL also drops every other question cached with it, which
+        covers translations that were served through a similarity match.
+        """
+        key = self.normalize(question)
+        with self.lock:
+            keys = [key] + [other for other, cached_sql in self.entries.items() if sql is not None and cached_sql == sql]
+            keys = [dropped for dropped in dict.fromkeys(keys) if self.entries.pop(dropped, None) is not None]
+            for dropped in keys:
+                self.pending_touches.pop(dropped, None)
+            if keys:
+                self.conn.executemany(
+                    f"DELETE FROM {TRANSLATION_TABLE} WHERE schema_version = ? AND question_key = ?",
+                    [(self.version, dropped) for dropped in keys]
+                )
+                self.conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,272 @@
+import os
+import re
+import json
+import difflib
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import pandas as pd
+
+from dataset_cache import cache_dir_for, dataset_fingerprint, prefix_sha256
+
+INDEX_FILE_SUFFIX = ".values.json"
+INDEX_FORMAT_VERSION = 1
+MAX_DISTINCT_VALUES = 50_000
+MAX_PHRASE_WORDS = 6
+FUZZY_CUTOFF = 0.8
+MIN_FUZZY_LENGTH = 4
+MIN_MATCH_SCORE = 0.75
+MAX_MATCHES = 10
+MAX_FUZZY_CANDIDATES = 32
+
+WORD = re.compile(r"[a-z0-9]+")
+DATE_VALUE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+NUMBER_VALUE = re.compile(r"^-?\d+(\.\d+)?$")
+STOPWORDS = {"a", "an", "the", "and", "or", "of", "in", "on", "by", "for", "to", "all", "any", "is", "are", "me", "my"}
+COMMON_WORDS = {
+    "net", "gross", "valid", "invalid", "total", "other", "others", "unknown", "none", "new", "old", "open",
+    "closed", "complete", "sale", "sales", "order", "orders", "paid", "free", "home", "best", "top", "cash",
+    "card", "online", "offline", "yes", "no", "true", "false", "active", "pending", "general", "standard",
+}
+GENERIC_COLUMN_WORDS = {"id", "code", "status", "type", "name", "method", "date", "at", "value"}
+
+
+def normalize_value(value: Any) -> str:
+    return " ".join(WORD.findall(str(value).lower().replace("'", "")))
+
+
+def trigrams(word: str) -> Set[str]:
+    """
+    Character trigrams of a word padded with spaces, so short words and
+    word edges also yield trigrams ('cash' -> '  c', ' ca', 'cas', 'ash', 'sh ').
+    """
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def indexable_columns(schema: Dict[str, Dict[str, Any]], max_distinct: int = MAX_DISTINCT_VALUES) -> List[str]:
+    """
+    Categorical columns worth indexing: text columns that are not dates or
+    small integers and have at most max_distinct values.
+    """
+    columns = []
+    for column, entry in schema.items():
+        if entry.get("type") != "categorical":
+            continue
+        values = [str(value) for value in entry.get("values") or []]
+        if values and all(DATE_VALUE.match(value) or NUMBER_VALUE.match(value) for value in values):
+            continue
+        if entry.get("distinct_count", 0) <= max_distinct:
+            columns.append(column)
+    return columns
+
+
+def _distinct_values(df: pd.DataFrame, columns: Iterable[str]) -> Dict[str, Set[str]]:
+    values = {}
+    for column in columns:
+        if column not in df.columns:
+            continue
+        series = df[column].dropna()
+        values[column] = {str(value) for value in series.unique()}
+    return values
+
+
+class ValueIndex:
+    """
+    Dictionary of every distinct value of the indexed columns, for
+    resolving the literals a question refers to.
+
+    Values are normalized to lowercase words. Whole phrases of the question
+    are looked up exactly (up to MAX_PHRASE_WORDS words); other words are
+    matched, exactly or fuzzily, against the word vocabulary through an
+    inverted index (word -> values containing it), and a value is accepted
+    when its words, stopwords aside, are matched closely enough on average.
+    Fuzzy candidates come from a trigram index of the vocabulary (trigram ->
+    words containing it): only the MAX_FUZZY_CANDIDATES words sharing the
+    most trigrams with a question word are scored, not the whole vocabulary.
+
+    A value that is a single ordinary word (COMMON_WORDS, e.g. 'Net' or
+    'Others') is only accepted when the question also names its column
+    by a distinctive word ('bi' for bi_status), since "net sales" rarely
+    means a filter on it.
+    """
+
+    def __init__(self, values: Dict[str, Set[str]]):
+        self.values = values
+        self.phrases: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        self.postings: Dict[str, Set[Tuple[str, str]]] = defaultdict(set)
+        self.word_counts: Dict[Tuple[str, str], int] = {}
+        self.trigram_words: Dict[str, Set[str]] = defaultdict(set)
+        self.column_cues: Dict[str, Set[str]] = {}
+        for column, column_values in values.items():
+            self.add(column, column_values)
+
+    def add(self, column: str, column_values: Iterable[str]) -> None:
+        self.column_cues[column] = set(WORD.findall(column.lower().replace("_", " "))) - GENERIC_COLUMN_WORDS
+        for value in column_values:
+            key = (column, value)
+            if key in self.word_counts:
+                continue
+            words = normalize_value(value).split()
+            if not words or all(word.isdigit() for word in words):
+                continue
+            self.phrases[" ".join(words)].append(key)
+            significant = set(words) - STOPWORDS or set(words)
+            for word in significant:
+                if word not in self.postings:
+                    for trigram in trigrams(word):
+                        self.trigram_words[trigram].add(word)
+                self.postings[word].add(key)
+            self.word_counts[key] = len(significant)
+        self.values.setdefault(column, set()).update(column_values)
+
+    def close_words(self, word: str, n: int = 3, cutoff: float = FUZZY_CUTOFF) -> List[Tuple[str, float]]:
+        """
+        Returns up to n vocabulary words similar to word as (word, ratio),
+        best first, with the difflib ratio at least cutoff. Like
+        difflib.get_close_matches, but only over the words sharing the
+        most trigrams with it.
+        """
+        shared: Dict[str, int] = defaultdict(int)
+        for trigram in trigrams(word):
+            for candidate in self.trigram_words.get(trigram, ()):
+                shared[candidate] += 1
+        candidates = sorted(shared, key=lambda candidate: -shared[candidate])[:MAX_FUZZY_CANDIDATES]
+
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(word)
+        scored = []
+        for candidate in candidates:
+            matcher.set_seq1(candidate)
+            if matcher.real_quick_ratio() >= cutoff and matcher.quick_ratio() >= cutoff:
+                ratio = matcher.ratio()
+                if ratio >= cutoff:
+                    scored.append((candidate, ratio))
+        return sorted(scored, key=lambda item: (-item[1], item[0]))[:n]
+
+    def resolve(self, question: str, limit: int = MAX_MATCHES) -> List[Dict[str, Any]]:
+        """
+        Returns the column values a question most likely refers to, best first:
+        [{'column', 'value', 'score', 'matched'}, ...] with score in (0, 1].
+        """
+        words = normalize_value(question).split()
+        matches: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        covered = set()
+
+        for size in range(min(MAX_PHRASE_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                if any(position in covered for position in range(start, start + size)):
+                    continue
+                phrase = " ".join(words[start:start + size])
+                if size == 1 and phrase in STOPWORDS:
+                    continue
+                for key in self.phrases.get(phrase, []):
+                    matches[key] = {"column": key[0], "value": key[1], "score": 1.0, "matched": phrase}
+                if phrase in self.phrases:
+                    covered.update(range(start, start + size))
+
+        similarity: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(dict)
+        for position, word in enumerate(words):
+            if position in covered or word in STOPWORDS:
+                continue
+            if word in self.postings:
+                candidates = [(word, 1.0)]
+            elif len(word) >= MIN_FUZZY_LENGTH:
+                candidates = self.close_words(word)
+            else:
+                continue
+            for candidate, ratio in candidates:
+                for key in self.postings[candidate]:
+                    similarity[key][candidate] = max(similarity[key].get(candidate, 0.0), ratio)
+
+        for key, matched_words in similarity.items():
+            if key in matches:
+                continue
+            score = sum(matched_words.values()) / self.word_counts[key]
+            if score >= MIN_MATCH_SCORE:
+                matches[key] = {"column": key[0], "value": key[1], "score": round(score, 3), "matched": " ".join(sorted(matched_words))}
+
+        cues = set(words)
+        matches = {
+            key: match for key, match in matches.items()
+            if not self._is_common_word(key) or self.column_cues.get(key[0], set()) & cues
+        }
+        return sorted(matches.values(), key=lambda match: -match["score"])[:limit]
+
+    def _is_common_word(self, key: Tuple[str, str]) -> bool:
+        words = normalize_value(key[1]).split()
+        return len(words) == 1 and words[0] in COMMON_WORDS
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "columns": len(self.values),
+            "values": len(self.word_counts),
+            "words": len(self.postings),
+            "trigrams": len(self.trigram_words),
+        }
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {column: sorted(column_values) for column, column_values in self.values.items()}
+
+
+def index_path_for(source_path: str) -> str:
+    """
+    Returns the file holding the value index of a source, e.g.
+    data/raw/.cache/data.csv.values.json. It sits beside the columnar cache
+    rather than in it, so it outlives cache rebuilds and can be extended
+    when the source only grew.
+    """
+    return cache_dir_for(source_path) + INDEX_FILE_SUFFIX
+
+
+def load_value_index(source_path: str, df: pd.DataFrame, columns: List[str]) -> ValueIndex:
+    """
+    Loads the value index of a dataset, keeping it in step with the data:
+    - unchanged source and columns: the stored values are reused as they are
+    - source only grew by appending: the values of the new rows are added
+    - anything else: the index is rebuilt from df
+
+    The values are stored together with the source fingerprint and row
+    count they cover.
+    """
+    fingerprint = dataset_fingerprint(source_path)
+    path = index_path_for(source_path)
+    try:
+        with open(path) as fh:
+            stored = json.load(fh)
+    except (OSError, ValueError):
+        stored = None
+
+    if stored is not None and (stored.get("format_version") != INDEX_FORMAT_VERSION or stored.get("columns") != columns):
+        stored = None
+
+    if stored is not None and stored["source"]["sha256"] == fingerprint["sha256"]:
+        return ValueIndex({column: set(values) for column, values in stored["values"].items()})
+
+    if (
+        stored is not None
+        and stored["row_count"] <= len(df)
+        and fingerprint["size"] > stored["source"]["size"]
+        and prefix_sha256(source_path, stored["source"]["size"]) == stored["source"]["sha256"]
+    ):
+        index = ValueIndex({column: set(values) for column, values in stored["values"].items()})
+        for column, values in _distinct_values(df.iloc[stored["row_count"]:], columns).items():
+            index.add(column, values)
+        logging.info(f"Value index: added {len(df) - stored['row_count']} appended rows")
+    else:
+        index = ValueIndex(_distinct_values(df, columns))
+        logging.info(f"Value index: built over {index.stats()['values']} values in {len(columns)} columns")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staging_path = f"{path}.{os.getpid()}.tmp"
+    with open(staging_path, "w") as fh:
+        json.dump({
+            "format_version": INDEX_FORMAT_VERSION,
+            "source": fingerprint,
+            "row_count": len(df),
+            "columns": columns,
+            "values": index.to_dict(),
+        }, fh)
+    os.replace(staging_path, path)
+    return index
@@ -0,0 +1,28 @@
+import os
+import sys
+
+import orjson
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app", "services"))
+
+from serializers import encode_frame  # noqa: E402
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "created_at": pd.to_datetime(["2016-07-01 00:00:00", "2016-07-02 13:45:10", None]),
+        "grand_total": [240.0, 2450.5, 10.0],
+    })
+
+
+def test_datetimes_match_across_json_formats():
+    df = _frame()
+
+    records = [row["created_at"] for row in orjson.loads(encode_frame(df, "records", "Success"))["data"]]
+    columns = orjson.loads(encode_frame(df, "columns", "Success"))["data"]["created_at"]
+    ndjson = [orjson.loads(line)["created_at"] for line in encode_frame(df, "ndjson", "Success").splitlines()]
+
+    expected = ["2016-07-01 00:00:00", "2016-07-02 13:45:10"]
+    assert records[:2] == columns[:2] == ndjson[:2] == expected
+    assert columns[2] is None and ndjson[2] is None and records[2] == ""
@@ -0,0 +1,19 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app", "services"))
+
+from value_index import ValueIndex  # noqa: E402
+
+
+def test_fuzzy_words_resolve_through_trigram_candidates():
+    index = ValueIndex({
+        "city": {"Karachi", "Lahore", "Islamabad"},
+        "payment_method": {"cod", "easypaisa", "jazzwallet"},
+    })
+
+    assert [word for word, _ in index.close_words("islambad")] == ["islamabad"]
+    assert index.close_words("zzzz") == []
+
+    matches = {(match["column"], match["value"]) for match in index.resolve("orders from karachii paid with easypasa")}
+    assert matches == {("city", "Karachi"), ("payment_method", "easypaisa")}
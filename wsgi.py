@@ -3,12 +3,8 @@ import os
 import logging
 
 
-app_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'app'))
-sys.path.append(app_path)
-
-from app import app
-
-
+# Configure logging before importing the app, so module-level loggers and
+# the dataset loaded at import time report through these handlers.
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -17,6 +13,13 @@ logging.basicConfig(
         logging.FileHandler('app.log')
     ]
 )
+
+app_path = os.path.abspath(os.path.join(os.path.dirname(__file__), 'app'))
+sys.path.append(app_path)
+
+from app import app
+
+
 logger = logging.getLogger(__name__)
 
 